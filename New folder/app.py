@@ -1,19 +1,25 @@
 import streamlit as st
-import pandas as pd
 import os
-import pdfplumber
-import base64
-import zipfile
 import shutil
-from io import BytesIO
 from datetime import datetime
 import re
+import sys
 
 # --- CONFIG ---
 # This ensures we are always in the correct folder
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_FILE = os.path.join(BASE_DIR, "cv_database.csv")
+# Shared modules (cv_audit, ...) live one folder up
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+import cv_store
+import cv_jobs
+import cv_export
+import cv_viewer
+import st_cache
+DB_FILE = os.path.join(BASE_DIR, "cv_database.csv")  # legacy CSV, imported into the store once
+STORE_FILE = os.path.join(BASE_DIR, "cv_database.db")
 SAVE_FOLDER = os.path.join(BASE_DIR, "cv_files")
+# Served by Streamlit itself (enableStaticServing): must sit next to this script
+STATIC_DIR = os.path.join(BASE_DIR, "static")
 ADMIN_PASSWORD = "admin123"
 
 if not os.path.exists(SAVE_FOLDER):
@@ -21,49 +27,40 @@ if not os.path.exists(SAVE_FOLDER):
 
 
 # --- DETECTION ENGINE ---
-def perform_detailed_audit(text):
-    t = " ".join(text.lower().split())
-    criteria = {
-        "Personal Profile": ["profile", "summary", "objective", "about me", "career", "biography", "statement"],
-        "Personal Details": ["nationality", "date of birth", "gender", "marital status", "id number", "dob", "bio",
-                             "residence"],
-        "Contact Info": ["email", "phone", "address", "contact", "cell", "telephone", "mobile"],
-        "Language Proficiency": ["language", "english", "swahili", "proficiency", "speak"],
-        "Academic Qualification": ["academic", "education", "degree", "university", "school", "college", "kcse"],
-        "Professional Qualification": ["professional qualification", "certification", "certified", "diploma"],
-        "Professional Experience": ["experience", "employment", "work history", "internship", "duties"],
-        "Training & Workshops": ["training", "workshop", "seminar", "course"],
-        "Technical Literacy": ["computer", "literacy", "software", "ict", "digital", "office", "excel", "word"],
-        "Referees": ["referees", "references", "recommendation", "referee"]
-    }
-    audit_results = {}
-    found_count = 0
-    for label, keywords in criteria.items():
-        is_found = any(key in t for key in keywords)
-        audit_results[label] = "✅ Found" if is_found else "❌ Missing"
-        if is_found: found_count += 1
-    score = int((found_count / len(criteria)) * 100)
-    detailed_report = " | ".join([f"{k}: {v}" for k, v in audit_results.items()])
-    return score, detailed_report
+CRITERIA = {
+    "Personal Profile": ["profile", "summary", "objective", "about me", "career", "biography", "statement"],
+    "Personal Details": ["nationality", "date of birth", "gender", "marital status", "id number", "dob", "bio",
+                         "residence"],
+    "Contact Info": ["email", "phone", "address", "contact", "cell", "telephone", "mobile"],
+    "Language Proficiency": ["language", "english", "swahili", "proficiency", "speak"],
+    "Academic Qualification": ["academic", "education", "degree", "university", "school", "college", "kcse"],
+    "Professional Qualification": ["professional qualification", "certification", "certified", "diploma"],
+    "Professional Experience": ["experience", "employment", "work history", "internship", "duties"],
+    "Training & Workshops": ["training", "workshop", "seminar", "course"],
+    "Technical Literacy": ["computer", "literacy", "software", "ict", "digital", "office", "excel", "word"],
+    "Referees": ["referees", "references", "recommendation", "referee"]
+}
+
+# Audits interrupted by a restart go back on the background queue
+cv_jobs.resume_pending(STORE_FILE, SAVE_FOLDER, CRITERIA)
 
 
 # --- HELPERS ---
 def display_pdf(file_path):
     try:
-        with open(file_path, "rb") as f:
-            pdf_data = f.read()
-            base64_pdf = base64.b64encode(pdf_data).decode('utf-8')
-
-        # 1. Download/Open Link (Chrome-friendly)
-        st.download_button(
-            label="📥 Download & View CV (Recommended)",
-            data=pdf_data,
-            file_name=os.path.basename(file_path),
-            mime="application/pdf"
-        )
+        # Every view below points at the app's static route: the browser fetches
+        # the file itself (with Range requests) instead of receiving it inlined
+        pdf_url = cv_viewer.file_url(SAVE_FOLDER, os.path.basename(file_path), STATIC_DIR)
+        if pdf_url is None:
+            st.warning("This file is too large to preview.")
+            return
+
+        # 1. Download Link (same origin, so the download attribute applies)
+        st.markdown(
+            f'<a href="{pdf_url}" download="{os.path.basename(file_path)}">📥 Download CV</a>',
+            unsafe_allow_html=True)
 
         # 2. Direct Link for Fullscreen
-        pdf_url = f"data:application/pdf;base64,{base64_pdf}"
         st.markdown(
             f'<a href="{pdf_url}" target="_blank" style="text-decoration:none;"><div style="background-color:#ff4b4b;color:white;padding:10px;border-radius:5px;text-align:center;">Click Here to View Fullscreen (If blocked below)</div></a>',
             unsafe_allow_html=True)
@@ -75,20 +72,31 @@ def display_pdf(file_path):
         st.error(f"Error loading preview: {e}")
 
 
-def create_zip_of_cvs(folder_path):
-    buf = BytesIO()
-    with zipfile.ZipFile(buf, "w") as z:
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                if file.endswith(".pdf"):
-                    z.write(os.path.join(root, file), file)
-    return buf.getvalue()
+def show_thumbnails(df_page, per_row=5):
+    # First pages of the listed CVs, rendered once and then read from the disk cache
+    cols = st.columns(per_row)
+    for i, (name, student_id) in enumerate(zip(df_page["Name"], df_page["ID"])):
+        target = os.path.join(SAVE_FOLDER, f"{student_id}.pdf")
+        thumb = (cv_viewer.thumbnail(target, os.path.join(BASE_DIR, cv_viewer.THUMB_DIR))
+                 if os.path.exists(target) else None)
+        with cols[i % per_row]:
+            if thumb:
+                st.image(thumb, caption=f"{name} ({student_id})", use_container_width=True)
+            else:
+                st.caption(f"{name} ({student_id}): no preview")
+
+
+# Both are keyed on the store stamp: re-queried only after a submit or an audit write-back
+@st_cache.cache_data("status counts", max_entries=5)
+def _status_counts(store_stamp):
+    cv_store.connect(STORE_FILE, legacy_csv=DB_FILE).close()  # first run: import the legacy CSV
+    return cv_store.status_counts(STORE_FILE)
 
 
-def load_data():
-    if os.path.exists(DB_FILE):
-        return pd.read_csv(DB_FILE)
-    return pd.DataFrame(columns=["Name", "ID", "Score", "Audit_Details", "Timestamp"])
+@st_cache.cache_data("submission pages", max_entries=200)
+def _submission_page(store_stamp, search, score_range, status, sort, page, page_size):
+    return cv_store.query_submissions(STORE_FILE, search, score_range[0], score_range[1],
+                                      status=status, sort=sort, page=page, page_size=page_size)
 
 
 # --- UI SETUP ---
@@ -133,17 +141,15 @@ with tab1:
                 with open(full_path, "wb") as f:
                     f.write(u_file.getbuffer())
 
-                with pdfplumber.open(u_file) as pdf:
-                    raw_text = " ".join([p.extract_text() for p in pdf.pages if p.extract_text()])
-
-                score, details = perform_detailed_audit(raw_text)
-                df = load_data()
-                new_row = pd.DataFrame([{
-                    "Name": u_name, "ID": u_id, "Score": score,
-                    "Audit_Details": details, "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M")
-                }])
-                pd.concat([df, new_row], ignore_index=True).to_csv(DB_FILE, index=False)
-                st.success(f"✅ Success! {u_name}, your CV has been recorded.")
+                # Acknowledge now; the audit score is filled in by a background worker
+                row_id = cv_store.append_submission(STORE_FILE, u_name, u_id, None, "⏳ Audit in progress",
+                                                    datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                                    legacy_csv=DB_FILE, status=cv_store.PENDING)
+                if cv_jobs.submit(STORE_FILE, row_id, full_path, CRITERIA):
+                    st.success(f"✅ Success! {u_name}, your CV has been recorded.")
+                else:
+                    st.warning(f"⚠️ {u_name}, your CV has been recorded, but the automatic audit could not "
+                               "start. An administrator will review it.")
 
 with tab2:
     if "authenticated" not in st.session_state:
@@ -162,37 +168,86 @@ with tab2:
             st.session_state["authenticated"] = False
             st.rerun()
 
-        df_admin = load_data()
-        if not df_admin.empty:
-            zip_data = create_zip_of_cvs(SAVE_FOLDER)
-            st.download_button("📥 Download All CVs (.zip)", zip_data, "CV_Collection.zip")
-            st.dataframe(df_admin, use_container_width=True)
+        status_counts = _status_counts(cv_store.stamp(STORE_FILE))
+        if sum(status_counts.values()):
+            # Built only on request, from the on-disk cache when nothing changed, then
+            # linked from the static route so the browser streams it from disk
+            if st.button("📦 Prepare All CVs (.zip)"):
+                st.session_state["cv_zip"] = cv_export.build_cv_zip(SAVE_FOLDER,
+                                                                    os.path.join(BASE_DIR, cv_export.CACHE_DIR))
+            zip_path = st.session_state.get("cv_zip")
+            if zip_path and os.path.exists(zip_path):
+                zip_url = cv_viewer.publish(zip_path, STATIC_DIR)
+                if zip_url:
+                    st.markdown(f'<a href="{zip_url}" download="CV_Collection.zip">📥 Download All CVs (.zip)</a>',
+                                unsafe_allow_html=True)
+                else:
+                    # Past Streamlit's static file limit: sent through the websocket instead
+                    with open(zip_path, "rb") as zip_file:
+                        st.download_button("📥 Download All CVs (.zip)", zip_file, "CV_Collection.zip")
+
+            s1, s2, s3 = st.columns(3)
+            s1.metric("⏳ Pending", int(status_counts.get(cv_store.PENDING, 0)))
+            s2.metric("✅ Audited", int(status_counts.get(cv_store.DONE, 0)))
+            s3.metric("❌ Failed", int(status_counts.get(cv_store.FAILED, 0)))
+
+            # Search, filter, sort and paging all run in SQLite; only the visible page is sent
+            f1, f2, f3, f4, f5 = st.columns([2, 2, 1, 2, 1])
+            search = f1.text_input("🔍 Search Name or Student ID")
+            score_range = f2.slider("Score range", 0, 100, (0, 100))
+            status = f3.selectbox("Status", ["All", cv_store.DONE, cv_store.PENDING, cv_store.FAILED])
+            sort = f4.selectbox("Sort by", list(cv_store.SORTS))
+            page_size = f5.selectbox("Rows", [25, 50, 100])
+            # The full range also keeps rows that have no score yet (pending / failed)
+            score_filter = (None, None) if score_range == (0, 100) else score_range
+            filters = (cv_store.stamp(STORE_FILE), search, score_filter,
+                       None if status == "All" else status, sort)
+
+            _, total = _submission_page(*filters, 1, page_size)
+            page_count = max(1, -(-total // page_size))
+            page = st.number_input(f"Page (of {page_count}, {total} matches)", 1, page_count, 1)
+            df_page, _ = _submission_page(*filters, page, page_size)
+            st.dataframe(df_page, use_container_width=True)
+            if st.checkbox("🖼️ Skim first-page thumbnails"):
+                show_thumbnails(df_page)
 
             st.divider()
-            names = df_admin["Name"].unique().tolist()
-            sel_name = st.selectbox("Select Student", names)
-            rec = df_admin[df_admin["Name"] == sel_name].iloc[-1]
-
-            col1, col2 = st.columns([1, 2])
-            with col1:
-                st.metric("Audit Score", f"{rec['Score']}/100")
-                for line in str(rec['Audit_Details']).split(" | "):
-                    if "✅" in line:
-                        st.success(line)
+            if df_page.empty:
+                st.info("No submissions match these filters.")
+            else:
+                options = dict(zip(df_page["Name"].fillna("?") + " (" + df_page["ID"].astype(str) + ")",
+                                   df_page["ID"]))
+                sel_name = st.selectbox("Select Student", list(options))
+                # Indexed lookup of the student's latest submission
+                rec = cv_store.find_latest(STORE_FILE, student_id=options[sel_name])
+
+                col1, col2 = st.columns([1, 2])
+                with col1:
+                    if rec['Audit_Status'] == cv_store.PENDING:
+                        st.info("⏳ Audit in progress, refresh in a few seconds.")
+                    elif rec['Audit_Status'] == cv_store.FAILED:
+                        st.error(str(rec['Audit_Details']))
                     else:
-                        st.error(line)
-
-            with col2:
-                target = os.path.join(SAVE_FOLDER, f"{rec['ID']}.pdf")
-                if os.path.exists(target):
-                    display_pdf(target)
-                else:
-                    st.error("File not found on server.")
+                        st.metric("Audit Score", f"{rec['Score']}/100")
+                        for line in str(rec['Audit_Details']).split(" | "):
+                            if "✅" in line:
+                                st.success(line)
+                            else:
+                                st.error(line)
+
+                with col2:
+                    target = os.path.join(SAVE_FOLDER, f"{rec['ID']}.pdf")
+                    if os.path.exists(target):
+                        display_pdf(target)
+                    else:
+                        st.error("File not found on server.")
 
             st.divider()
             with st.expander("⚠️ Danger Zone"):
                 if st.button("RESET DATABASE"):
                     if os.path.exists(DB_FILE): os.remove(DB_FILE)
+                    cv_store.reset(STORE_FILE)
                     if os.path.exists(SAVE_FOLDER): shutil.rmtree(SAVE_FOLDER)
                     os.makedirs(SAVE_FOLDER)
+                    cv_viewer.unpublish_all(STATIC_DIR)
                     st.rerun()
\ No newline at end of file
@@ -1,22 +1,36 @@
 import pandas as pd
-import ollama
+import llm_cache
+import vector_index
+import checkpoint
+import instrument
 import os
 
 # 1. Load the Scholar data
 INPUT_FILE = "scholar_summary.csv"
 OUTPUT_FILE = "tanzania_knowledge_analysis.csv"
+PROGRESS_FILE = "tanzania_knowledge_analysis.jsonl"
+PROMPT_VERSION = "scholar-v1"
 
 if not os.path.exists(INPUT_FILE):
     print(f"❌ Could not find {INPUT_FILE}!")
     exit()
 
-df = pd.read_csv(INPUT_FILE)
+instrument.start("analyze_scholar")
+with instrument.span("csv read"):
+    df = pd.read_csv(INPUT_FILE)
 results = []
 
-print(f"🧠 Analyzing {len(df)} snippets with DeepSeek-R1 (Light Mode)...")
+# Snippets finished by an earlier (interrupted) run are not analysed again
+done = checkpoint.load(PROGRESS_FILE)
+print(f"🧠 Analyzing {len(df)} snippets with DeepSeek-R1 (Light Mode), {len(done)} already done...")
+progress = open(PROGRESS_FILE, "a", encoding="utf-8")
 
 # 2. Loop through snippets
 for index, row in df.iterrows():
+    key = checkpoint.row_key(row)
+    if key in done:
+        results.append({k: done[key][k] for k in ("Title", "Link", "AI_Analysis")})
+        continue
     print(f"[{index + 1}/{len(df)}] Analyzing: {row['Title'][:50]}...")
 
     # Simple prompt for the 1.5b model
@@ -29,18 +43,32 @@ for index, row in df.iterrows():
     2. A gap (what is missing in their knowledge system?).
     """
 
+    ok = True
     try:
-        response = ollama.chat(model='deepseek-r1:1.5b', messages=[{'role': 'user', 'content': prompt}])
+        with instrument.span("llm"):
+            response = checkpoint.with_retries(lambda: llm_cache.chat(
+                model='deepseek-r1:1.5b', messages=[{'role': 'user', 'content': prompt}], template=PROMPT_VERSION))
         analysis = response['message']['content']
     except Exception as e:
         analysis = f"Error: {e}"
+        ok = False
+        instrument.count("llm errors")
 
-    results.append({
+    record = {
         "Title": row['Title'],
         "Link": row['Link'],
         "AI_Analysis": analysis
-    })
+    }
+    results.append(record)
+    checkpoint.append(progress, record, ok)
+
+progress.close()
 
 # 3. Save results
-pd.DataFrame(results).to_csv(OUTPUT_FILE, index=False)
-print(f"\n✅ Done! Analysis saved to {OUTPUT_FILE}")
\ No newline at end of file
+with instrument.span("csv save", items=len(results)):
+    checkpoint.finalize(pd.DataFrame(results), OUTPUT_FILE)
+with instrument.span("index sync"):
+    vector_index.sync_csv(OUTPUT_FILE)
+print(f"\n✅ Done! Analysis saved to {OUTPUT_FILE}")
+print(llm_cache.summary())
+print(instrument.finish())
\ No newline at end of file
@@ -1,14 +1,29 @@
 import pandas as pd
-import ollama
+import llm_cache
+import vector_index
+import checkpoint
+import instrument
+
+PROMPT_VERSION = "snippets-v1"
+PROGRESS_FILE = "final_gap_analysis.jsonl"
 
 # 1. Load the links/snippets
-df = pd.read_csv("scholar_summary.csv")
+instrument.start("analyze_snippets")
+with instrument.span("csv read"):
+    df = pd.read_csv("scholar_summary.csv")
 
-print(f"🧠 Analyzing {len(df)} snippets with DeepSeek-R1 (Light Mode)...")
+# Resume: rows finished before a crash/Ctrl-C are reused, failed ones retried
+done = checkpoint.load(PROGRESS_FILE)
+print(f"🧠 Analyzing {len(df)} snippets with DeepSeek-R1 (Light Mode), {len(done)} already done...")
 
 analysis_results = []
+progress = open(PROGRESS_FILE, "a", encoding="utf-8")
 
 for index, row in df.iterrows():
+    key = checkpoint.row_key(row)
+    if key in done:
+        analysis_results.append(done[key]["AI_Analysis"])
+        continue
     print(f"Processing ({index + 1}/{len(df)}): {row['Title'][:50]}")
 
     prompt = f"""Analyze this paper snippet and identify:
@@ -17,12 +32,24 @@ for index, row in df.iterrows():
     PAPER: {row['Title']} - {row['Snippet']}"""
 
     try:
-        response = ollama.chat(model='deepseek-r1:8b', messages=[{'role': 'user', 'content': prompt}])
-        analysis_results.append(response['message']['content'])
-    except:
-        analysis_results.append("AI Error")
+        with instrument.span("llm"):
+            response = checkpoint.with_retries(lambda: llm_cache.chat(
+                model='deepseek-r1:8b', messages=[{'role': 'user', 'content': prompt}], template=PROMPT_VERSION))
+        analysis, ok = response['message']['content'], True
+    except Exception:
+        analysis, ok = "AI Error", False
+        instrument.count("llm errors")
+    analysis_results.append(analysis)
+    checkpoint.append(progress, {"Title": row['Title'], "Link": row['Link'], "AI_Analysis": analysis}, ok)
+
+progress.close()
 
 # 2. Add analysis back to the CSV
 df['AI_Analysis'] = analysis_results
-df.to_csv("final_gap_analysis.csv", index=False)
-print("✅ Completed! View 'final_gap_analysis.csv' for the results.")
\ No newline at end of file
+with instrument.span("csv save", items=len(df)):
+    checkpoint.finalize(df, "final_gap_analysis.csv")
+with instrument.span("index sync"):
+    vector_index.sync_csv("final_gap_analysis.csv")
+print("✅ Completed! View 'final_gap_analysis.csv' for the results.")
+print(llm_cache.summary())
+print(instrument.finish())
\ No newline at end of file
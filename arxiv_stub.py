@@ -0,0 +1,125 @@
+import os
+import threading
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# --- LOCAL ARXIV API & PDF HOST STAND-IN ---
+# Serves /api/query as an Atom feed and /pdf/<id> as synthetic PDFs (with HTTP
+# Range support), so auto_search.py / paper_fetch.py run offline:
+#   python arxiv_stub.py
+#   ARXIV_API=http://127.0.0.1:8766/api python auto_search.py
+# Two titles share their first 50 characters and two IDs serve identical bytes,
+# to exercise the filename and checksum dedupe. With STUB_FLAKY=1 the first
+# full download of each PDF is cut off halfway, to exercise Range resumes.
+PORT = int(os.getenv("STUB_PORT", "8766"))
+FLAKY = os.getenv("STUB_FLAKY") == "1"
+TOTAL = 500
+PDF_SIZE = 300_000
+
+_cut = set()
+_cut_lock = threading.Lock()
+
+
+def _paper_id(n):
+    return f"2401.{n:05d}v1"
+
+
+def _title(n):
+    if n in (1, 2):
+        return f"A Very Long Shared Title Prefix About Knowledge Management Part {n}"
+    return f"Synthetic Paper {n} on Research Gaps"
+
+
+def _pdf_bytes(paper_id):
+    n = int(paper_id.split(".")[1].split("v")[0])
+    seed = 3 if n == 4 else n  # 2401.00004 is a byte-for-byte copy of 2401.00003
+    header = f"%PDF-1.4\n% stub paper {seed}\n".encode("ascii")
+    filler = f"{seed} ".encode("ascii") * PDF_SIZE
+    return (header + filler)[:PDF_SIZE] + b"\n%%EOF\n"
+
+
+def _entry(n, base):
+    paper_id = _paper_id(n)
+    return f"""<entry>
+<id>http://arxiv.org/abs/{paper_id}</id>
+<updated>2024-01-0{1 + n % 9}T00:00:00Z</updated>
+<published>2024-01-0{1 + n % 9}T00:00:00Z</published>
+<title>{escape(_title(n))}</title>
+<summary>Stub abstract {n}.</summary>
+<author><name>Author {n}</name></author>
+<link href="http://arxiv.org/abs/{paper_id}" rel="alternate" type="text/html"/>
+<link title="pdf" href="{base}/pdf/{paper_id}" rel="related" type="application/pdf"/>
+<arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.DL" scheme="http://arxiv.org/schemas/atom"/>
+<category term="cs.DL" scheme="http://arxiv.org/schemas/atom"/>
+</entry>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/api/query":
+            self._feed(parse_qs(url.query))
+        elif url.path.startswith("/pdf/"):
+            self._pdf(url.path[len("/pdf/"):])
+        else:
+            self.send_error(404)
+
+    def _feed(self, query):
+        start = int(query.get("start", ["0"])[0])
+        count = int(query.get("max_results", ["10"])[0])
+        base = f"http://{self.headers.get('Host', f'127.0.0.1:{PORT}')}"
+        entries = "\n".join(_entry(n, base) for n in range(start + 1, min(start + count, TOTAL) + 1))
+        body = f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+<title>arXiv stub query</title>
+<id>http://arxiv.org/api/stub</id>
+<updated>2024-01-01T00:00:00Z</updated>
+<opensearch:totalResults>{TOTAL}</opensearch:totalResults>
+<opensearch:startIndex>{start}</opensearch:startIndex>
+<opensearch:itemsPerPage>{count}</opensearch:itemsPerPage>
+{entries}
+</feed>""".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _pdf(self, paper_id):
+        data = _pdf_bytes(paper_id)
+        start = 0
+        rng = self.headers.get("Range")
+        if rng and rng.startswith("bytes="):
+            start = int(rng[len("bytes="):].split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        body = data[start:]
+        with _cut_lock:
+            cut = FLAKY and not rng and paper_id not in _cut
+            _cut.add(paper_id)
+        if cut:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True  # the client sees a truncated body
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    print(f"📚 arXiv stub listening on http://127.0.0.1:{PORT}/api")
+    ThreadingHTTPServer(("127.0.0.1", PORT), StubHandler).serve_forever()
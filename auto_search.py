@@ -1,12 +1,15 @@
 import arxiv
 import os
 import ssl
-import urllib.request
+import paper_fetch
 
 # --- FIX FOR SSL ERROR ---
 ssl._create_default_https_context = ssl._create_unverified_context
 # -------------------------
 
+# Set ARXIV_API to a local stand-in (see arxiv_stub.py) to run offline
+ARXIV_API = os.getenv("ARXIV_API", "https://export.arxiv.org/api").rstrip("/")
+
 # 1. User Input
 topic = input("Enter your research topic: ")
 num_papers = int(input("How many papers do you want to find? "))
@@ -17,26 +20,19 @@ if not os.path.exists("papers"):
 
 # 3. Search arXiv (Using the new Client method to avoid warnings)
 client = arxiv.Client()
+client.query_url_format = ARXIV_API + "/query?{}"
 search = arxiv.Search(
     query=topic,
     max_results=num_papers,
     sort_by=arxiv.SortCriterion.Relevance
 )
 
-# 4. Download Everything
 print(f"🔎 Searching for '{topic}'...")
-count = 0
-for result in client.results(search):
-    count += 1
-    # Clean title for filename (removes invalid characters)
-    clean_title = "".join(x for x in result.title if x.isalnum() or x in " -_")[:50]
-    filename = f"{clean_title}.pdf"
-
-    print(f"[{count}/{num_papers}] Downloading: {result.title}")
+papers = [{"arxiv_id": result.get_short_id(), "title": result.title, "pdf_url": result.pdf_url}
+          for result in client.results(search)]
 
-    try:
-        result.download_pdf(dirpath="papers", filename=filename)
-    except Exception as e:
-        print(f"⚠️ Could not download {result.title}: {e}")
+# 4. Download Everything (in parallel; papers already in the manifest are skipped)
+counts = paper_fetch.download_all(papers, "papers")
 
-print(f"\n✅ DONE! {count} papers are now in your 'papers' folder.")
\ No newline at end of file
+print(f"\n✅ DONE! {counts['downloaded']} new papers in your 'papers' folder "
+      f"({counts['skipped']} already there, {counts['duplicates']} duplicates, {counts['failed']} failed).")
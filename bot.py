@@ -1,37 +1,99 @@
-import requests
-from bs4 import BeautifulSoup
+import os
+import re
+import sys
 import csv
+import hashlib
+from bs4 import BeautifulSoup
+import crawler
+import instrument
+
+# Pass another base URL (e.g. a local copy of the site) as the first argument
+base_url = sys.argv[1].rstrip("/") if len(sys.argv) > 1 else "http://quotes.toscrape.com"
+CONCURRENCY = 4        # pages fetched at the same time
+RATE_LIMIT = 5.0       # max requests per second (be polite)
+OUTPUT_FILE = 'scraped_quotes.csv'
+CACHE_FILE = '.http_cache.db'  # ETag / Last-Modified / body hash per page
+# Site-specific: quotes.toscrape.com numbers its pages /page/<n>/, so with
+# BOT_PREFETCH=k the k pages after each Next link are queued too and fetched in
+# parallel (a page past the end just has no quotes and no Next). Off by
+# default: only links that are on the pages are followed.
+PREFETCH = int(os.getenv("BOT_PREFETCH", "0"))
 
-base_url = "http://quotes.toscrape.com"
-current_page = "/page/1/"
-all_quotes = []
+try:
+    import lxml  # noqa: F401  (much faster than html.parser)
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
 
-print("Starting the full-site crawl...")
 
-while current_page:
-    response = requests.get(base_url + current_page)
-    soup = BeautifulSoup(response.text, 'html.parser')
+def parse_page(url, html):
+    """Runs in a worker process: returns the page's quotes and the links to follow."""
+    with instrument.span("html parse"):
+        soup = BeautifulSoup(html, PARSER)
 
     # Extract quotes
-    quotes = soup.find_all('div', class_='quote')
-    for q in quotes:
+    rows = []
+    for q in soup.find_all('div', class_='quote'):
         text = q.find('span', class_='text').text
         author = q.find('small', class_='author').text
-        all_quotes.append([text, author])
+        rows.append([text, author])
 
-    print(f"Scraped: {current_page}")
-
-    # Check for the 'Next' button
+    # Follow the 'Next' button (and, if enabled, guess the pages after it)
+    links = []
     next_btn = soup.find('li', class_='next')
     if next_btn:
-        current_page = next_btn.find('a')['href']
+        href = next_btn.find('a')['href']
+        links.append(href)
+        match = re.search(r'/page/(\d+)/', href) if PREFETCH else None
+        if match:
+            n = int(match.group(1))
+            links += [f"/page/{n + k}/" for k in range(1, PREFETCH + 1)]
+    return rows, links
+
+
+def quote_key(text, author):
+    """Content key used to skip quotes we already have."""
+    return hashlib.sha1(f"{' '.join(text.split())}|{author.strip()}".encode('utf-8')).hexdigest()
+
+
+if __name__ == "__main__":
+    instrument.start("bot")
+    cache = crawler.HttpCache(CACHE_FILE)
+    known = set()
+    is_new_file = not os.path.exists(OUTPUT_FILE)
+    if not is_new_file:
+        with open(OUTPUT_FILE, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                known.add(quote_key(row['Quote'], row['Author']))
+        print(f"Starting incremental recrawl ({len(known)} quotes already saved)...")
     else:
-        current_page = None  # This stops the loop
+        cache.clear()  # no output yet, so every page must be parsed
+        print("Starting the full-site crawl...")
+    new_quotes = 0
+
+    # New quotes are appended as soon as each changed page is parsed
+    with open(OUTPUT_FILE, 'a', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        if is_new_file:
+            writer.writerow(['Quote', 'Author'])
+
+        def save_rows(url, rows):
+            global new_quotes
+            fresh = []
+            for text, author in rows:
+                key = quote_key(text, author)
+                if key not in known:
+                    known.add(key)
+                    fresh.append([text, author])
+            with instrument.span("csv write", items=len(fresh)):
+                writer.writerows(fresh)
+                file.flush()
+            new_quotes += len(fresh)
+            print(f"Scraped: {url.replace(base_url, '')} ({len(fresh)} new of {len(rows)} quotes)")
 
-# Save all 100 quotes
-with open('scraped_quotes.csv', 'w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    writer.writerow(['Quote', 'Author'])
-    writer.writerows(all_quotes)
+        pages, unchanged = crawler.crawl([base_url + "/page/1/"], parse_page, save_rows,
+                                         concurrency=CONCURRENCY, rate=RATE_LIMIT, cache=cache)
+    cache.close()
 
-print(f"Done! Collected {len(all_quotes)} quotes.")
\ No newline at end of file
+    print(f"Done! {pages} pages changed, {unchanged} unchanged; added {new_quotes} new quotes.")
+    print(instrument.finish())
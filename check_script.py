@@ -1,6 +1,7 @@
 import os
 import yaml
 import pandas as pd
+import file_manifest
 
 
 def analyze_student_cvs(folder_path):
@@ -10,9 +11,15 @@ def analyze_student_cvs(folder_path):
         print(f"Error: Folder '{folder_path}' not found.")
         return
 
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".yaml"):
-            with open(os.path.join(folder_path, filename), 'r') as f:
+    # Unchanged files reuse the row stored at their last check
+    manifest = file_manifest.Manifest("check_script.py")
+    files = sorted(f for f in os.listdir(folder_path) if f.endswith(".yaml"))
+    manifest.prune(os.path.join(folder_path, f) for f in files)
+    for filename in files:
+        path = os.path.join(folder_path, filename)
+        data = manifest.unchanged(path)
+        if data is None:
+            with open(path, 'r') as f:
                 data = yaml.safe_load(f)
 
                 # Logic: Calculate a quality score (0-100)
@@ -24,7 +31,9 @@ def analyze_student_cvs(folder_path):
 
                 data['quality_score'] = score
                 data['filename'] = filename
-                all_data.append(data)
+            manifest.record(path, data)
+        all_data.append(data)
+    manifest.close()
 
     # Create the organized database
     df = pd.DataFrame(all_data)
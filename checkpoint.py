@@ -0,0 +1,67 @@
+import os
+import json
+import time
+
+# --- CRASH-SAFE PROGRESS FILE ---
+# Each finished row is appended (and fsynced) to a JSONL file as soon as it is
+# done. On restart, rows already marked done are skipped; rows that ended in an
+# error are tried again. A line torn by a crash is cut off when the file is
+# loaded, so the next append starts on a line of its own. finalize() writes
+# the CSV atomically at the end.
+
+
+def row_key(row, fields=("Title", "Link")):
+    return tuple(str(row[f]) for f in fields)
+
+
+def repair(path):
+    """Truncates path after its last complete line (a crash can leave half a record)."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def load(path, fields=("Title", "Link")):
+    """{key: record} of every row that completed successfully; repairs a torn last line."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    repair(path)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            key = row_key(rec, fields)
+            if rec.get("_ok"):
+                done[key] = rec
+            else:
+                done.pop(key, None)
+    return done
+
+
+def append(fh, record, ok=True):
+    fh.write(json.dumps({**record, "_ok": ok}, ensure_ascii=False) + "\n")
+    fh.flush()
+    os.fsync(fh.fileno())
+
+
+def with_retries(fn, attempts=3, delay=2.0):
+    """Calls fn(), retrying transient failures with a growing pause."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == attempts:
+                raise
+            time.sleep(delay * attempt)
+
+
+def finalize(df, csv_path):
+    """Writes the finished table via a temp file, so a crash never leaves a half CSV."""
+    df.to_csv(csv_path + ".tmp", index=False)
+    os.replace(csv_path + ".tmp", csv_path)
@@ -0,0 +1,103 @@
+import re
+import math
+from collections import Counter
+
+# --- PROMPT CONTEXT BUILDER ---
+# Turns a pile of AI analyses into prompt context that fits a token budget:
+#   1. strip DeepSeek <think> blocks and drop near-duplicate analyses
+#   2. rank the rest by relevance to the topic (TF-IDF overlap)
+#   3. pack whole analyses (never cut mid-word) until the budget is full,
+#      or, if a summarize() function is given, map-reduce them into summaries
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+SEPARATOR = "\n---\n"
+
+
+def count_tokens(text):
+    """Exact with tiktoken installed, otherwise ~1.3 tokens per word/punctuation piece."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(WORD_RE.findall(text)) * 1.3)
+
+
+def clean(text):
+    return THINK_RE.sub("", str(text)).strip()
+
+
+def _shingles(text, size=3):
+    words = re.findall(r"\w+", text.lower())
+    return {tuple(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+
+def dedupe(texts, threshold=0.8):
+    """Drops analyses whose word 3-gram Jaccard similarity to a kept one is >= threshold."""
+    kept, kept_shingles = [], []
+    for text in texts:
+        s = _shingles(text)
+        if any(len(s & k) / max(1, len(s | k)) >= threshold for k in kept_shingles):
+            continue
+        kept.append(text)
+        kept_shingles.append(s)
+    return kept
+
+
+def rank(texts, query):
+    """Sorts analyses by TF-IDF overlap with the query words (most relevant first)."""
+    docs = [Counter(re.findall(r"\w+", t.lower())) for t in texts]
+    n = len(docs)
+    terms = set(re.findall(r"\w+", query.lower()))
+    idf = {w: math.log((n + 1) / (1 + sum(1 for d in docs if w in d))) + 1 for w in terms}
+
+    def score(i):
+        d = docs[i]
+        length = sum(d.values()) or 1
+        return sum(d[w] / length * idf[w] for w in terms)
+
+    order = sorted(range(n), key=score, reverse=True)
+    return [texts[i] for i in order]
+
+
+def pack(texts, budget):
+    """Greedily keeps whole analyses, in order, while they fit in the budget."""
+    packed, used = [], 0
+    sep_cost = count_tokens(SEPARATOR)
+    for text in texts:
+        cost = count_tokens(text) + sep_cost
+        if used + cost <= budget:
+            packed.append(text)
+            used += cost
+    return SEPARATOR.join(packed)
+
+
+def _batches(texts, budget):
+    batch, used = [], 0
+    for text in texts:
+        cost = count_tokens(text)
+        if batch and used + cost > budget:
+            yield batch
+            batch, used = [], 0
+        batch.append(text)
+        used += cost
+    if batch:
+        yield batch
+
+
+def build_context(texts, query, budget, summarize=None, max_rounds=3):
+    """
+    Returns prompt context of at most ~budget tokens. When everything does not
+    fit and summarize(text) is given, each budget-sized batch is summarised (map)
+    and the summaries are packed again (reduce).
+    """
+    items = rank(dedupe([c for c in (clean(t) for t in texts) if c]), query)
+    for _ in range(max_rounds):
+        total = sum(count_tokens(t) for t in items) + count_tokens(SEPARATOR) * len(items)
+        if total <= budget or summarize is None or len(items) <= 1:
+            break
+        items = [clean(summarize(SEPARATOR.join(batch))) for batch in _batches(items, budget)]
+    return pack(items, budget)
@@ -0,0 +1,158 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import deque
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import requests
+from requests.adapters import HTTPAdapter
+import instrument
+
+# --- CRAWLER ENGINE ---
+# Fetches run on a thread pool sharing one keep-alive session; parsing runs on
+# a process pool so it never blocks the fetchers. Newly found links go into a
+# frontier queue, so several pages are always in flight. A shared rate limiter
+# keeps the crawl polite no matter how many fetch threads there are.
+# With an HttpCache, requests are conditional (ETag / Last-Modified) and pages
+# whose body hash did not change are not parsed again; their stored links are
+# followed instead.
+
+
+class RateLimiter:
+    """Allows at most `rate` requests per second across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class HttpCache:
+    """Per-URL validators, body hash and outgoing links from the last crawl (SQLite)."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_sha256 TEXT, links TEXT)""")
+
+    def get(self, url):
+        row = self.conn.execute("SELECT etag, last_modified, body_sha256, links FROM pages WHERE url = ?",
+                                (url,)).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "sha256": row[2], "links": json.loads(row[3])}
+
+    def put(self, url, etag, last_modified, sha256, links):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                              (url, etag, last_modified, sha256, json.dumps(links)))
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM pages")
+
+    def close(self):
+        self.conn.close()
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "my-first-scrape/1.0 (+polite crawler)"
+    return session
+
+
+def _fetch(session, limiter, url, timeout, cached):
+    """Returns (html or None if unchanged, etag, last_modified, body sha256)."""
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+    limiter.wait()
+    with instrument.span("http fetch"):
+        response = session.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 304:
+        return None, cached["etag"], cached["last_modified"], cached["sha256"]
+    response.raise_for_status()
+    sha = hashlib.sha256(response.content).hexdigest()
+    etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+    if cached and sha == cached["sha256"]:
+        return None, etag, last_modified, sha  # same body under new validators
+    return response.text, etag, last_modified, sha
+
+
+def crawl(start_urls, parse, on_rows, concurrency=4, rate=5.0, parse_workers=2, timeout=15, log=print,
+          cache=None):
+    """
+    Crawls from start_urls. parse(url, html) -> (rows, links) must be a top-level
+    function (it runs in another process); on_rows(url, rows) is called on this
+    thread as soon as each page is parsed. Returns (pages parsed, pages unchanged).
+    """
+    session = make_session(concurrency)
+    limiter = RateLimiter(rate)
+    frontier = deque(start_urls)
+    seen = set(start_urls)
+    in_flight = {}
+    validators = {}
+    pages = unchanged = 0
+
+    def follow(url, links):
+        for link in links:
+            link = urljoin(url, link)
+            if link not in seen:
+                seen.add(link)
+                frontier.append(link)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as fetchers, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+        while frontier or in_flight:
+            fetching = sum(1 for kind, _ in in_flight.values() if kind == "fetch")
+            while frontier and fetching < concurrency:
+                url = frontier.popleft()
+                cached = cache.get(url) if cache else None
+                in_flight[fetchers.submit(_fetch, session, limiter, url, timeout, cached)] = ("fetch", url)
+                fetching += 1
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, url = in_flight.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    log(f"⚠️ {url}: {e}")
+                    continue
+                if kind == "fetch":
+                    html, etag, last_modified, sha = result
+                    if html is None:
+                        unchanged += 1
+                        cached = cache.get(url)
+                        if (etag, last_modified) != (cached["etag"], cached["last_modified"]):
+                            # A 200 with the old body: store its validators so the next crawl gets a 304
+                            cache.put(url, etag, last_modified, sha, cached["links"])
+                        follow(url, cached["links"])
+                    else:
+                        validators[url] = (etag, last_modified, sha)
+                        in_flight[parsers.submit(parse, url, html)] = ("parse", url)
+                    continue
+                rows, links = result
+                pages += 1
+                on_rows(url, rows)
+                if cache:
+                    cache.put(url, *validators.pop(url), links)
+                follow(url, links)
+    session.close()
+    return pages, unchanged
@@ -1,12 +1,19 @@
 import os
 import re
-import pandas as pd
+import csv
+import time
+import argparse
 from datetime import datetime
-from pypdf import PdfReader
+from concurrent.futures import ProcessPoolExecutor
+import pdf_text
+import file_manifest
+import instrument
+from cv_audit import EMAIL_RE, PHONE_RE
 
 # --- CONFIGURATION ---
 SOURCE_FOLDER = 'student_uploads'
 DATABASE_FILE = 'cv_database.csv'
+FIELDS = ['Student Name', 'Filename', 'Last Updated', 'Email', 'Phone', 'Words', 'Status']
 
 
 def clean_student_name(filename):
@@ -29,19 +36,17 @@ def analyze_cv_content(filepath):
     """Parses PDF to find errors and quality issues."""
     report = {"email": "Missing", "phone": "Missing", "word_count": 0, "issues": []}
     try:
-        reader = PdfReader(filepath)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
+        with instrument.span("pdf extract"):
+            text = "".join(pdf_text.extract_pages(filepath, engine="pypdf"))
 
         report["word_count"] = len(text.split())
 
         # Email Check
-        if re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text):
+        if EMAIL_RE.search(text):
             report["email"] = "Found"
 
         # Phone Check (standard 10+ digits)
-        if re.search(r'\+?\d{10,15}', text):
+        if PHONE_RE.search(text):
             report["phone"] = "Found"
 
         # Quality Checks
@@ -54,7 +59,44 @@ def analyze_cv_content(filepath):
     return report
 
 
-def run_manager():
+def standardize(filename):
+    """Renames the upload to CV_<Name>.pdf and returns (student_name, standard_filename)."""
+    old_path = os.path.join(SOURCE_FOLDER, filename)
+    student_name = clean_student_name(filename)
+    standard_filename = f"CV_{student_name.replace(' ', '_')}.pdf"
+    new_path = os.path.join(SOURCE_FOLDER, standard_filename)
+
+    # Rename the physical file
+    if old_path != new_path:
+        # Check if target exists to avoid errors
+        if os.path.exists(new_path): os.remove(new_path)
+        os.rename(old_path, new_path)
+    return student_name, standard_filename
+
+
+def build_record(student_name, standard_filename):
+    """Worker: analyses one standardized CV and returns (record, issues)."""
+    path = os.path.join(SOURCE_FOLDER, standard_filename)
+    analysis = analyze_cv_content(path)
+    mod_time = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M')
+    record = {
+        'Student Name': student_name,
+        'Filename': standard_filename,
+        'Last Updated': mod_time,
+        'Email': analysis["email"],
+        'Phone': analysis["phone"],
+        'Words': analysis["word_count"],
+        'Status': "Review Required" if analysis["issues"] or analysis["email"] == "Missing" else "Verified"
+    }
+    return record, analysis["issues"]
+
+
+def _build(job):
+    with instrument.span("cv"):
+        return build_record(*job)
+
+
+def run_manager(workers=1):
     if not os.path.exists(SOURCE_FOLDER):
         os.makedirs(SOURCE_FOLDER)
 
@@ -63,50 +105,65 @@ def run_manager():
         print("[!] No CVs found to process.")
         return
 
-    db_records = []
+    instrument.start("cv")
+    # 1. STANDARDIZATION (renames stay in this process, so two uploads that
+    # map to the same name are resolved in a fixed order)
+    with instrument.span("standardize", items=len(files)):
+        jobs = list(dict.fromkeys(standardize(f) for f in files))
+
+    # Files analysed before and unchanged since keep their last result
+    manifest = file_manifest.Manifest("cv.py")
+    paths = {job: os.path.join(SOURCE_FOLDER, job[1]) for job in jobs}
+    manifest.prune(paths.values())
+    previous = {job: manifest.unchanged(path) for job, path in paths.items()}
+    todo = [job for job in jobs if previous[job] is None]
+    instrument.count("unchanged", len(jobs) - len(todo))
+
+    # 2. ANALYSIS: one changed file per task across the pool; records are
+    # written to the database as soon as they come back
     issues_found = []
-
-    for filename in files:
-        old_path = os.path.join(SOURCE_FOLDER, filename)
-
-        # 1. STANDARDIZATION
-        student_name = clean_student_name(filename)
-        standard_filename = f"CV_{student_name.replace(' ', '_')}.pdf"
-        new_path = os.path.join(SOURCE_FOLDER, standard_filename)
-
-        # Rename the physical file
-        if old_path != new_path:
-            # Check if target exists to avoid errors
-            if os.path.exists(new_path): os.remove(new_path)
-            os.rename(old_path, new_path)
-
-        # 2. ANALYSIS
-        analysis = analyze_cv_content(new_path)
-        mod_time = datetime.fromtimestamp(os.path.getmtime(new_path)).strftime('%Y-%m-%d %H:%M')
-
-        # 3. DATABASE RECORD
-        record = {
-            'Student Name': student_name,
-            'Filename': standard_filename,
-            'Last Updated': mod_time,
-            'Email': analysis["email"],
-            'Phone': analysis["phone"],
-            'Words': analysis["word_count"],
-            'Status': "Review Required" if analysis["issues"] or analysis["email"] == "Missing" else "Verified"
-        }
-        db_records.append(record)
-
-        if record['Status'] == "Review Required":
-            issues_found.append(f"- {student_name}: {', '.join(analysis['issues']) or 'Missing Contact Info'}")
-
-    # Save Database
-    pd.DataFrame(db_records).to_csv(DATABASE_FILE, index=False)
+    done = 0
+    started = time.perf_counter()
+    report_every = max(1, len(todo) // 20)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(todo) > 1 else None
+    try:
+        results = pool.map(_build, todo, chunksize=4) if pool else map(_build, todo)
+        with open(DATABASE_FILE, 'w', newline='', encoding='utf-8') as db:
+            writer = csv.DictWriter(db, fieldnames=FIELDS)
+            writer.writeheader()
+
+            # 3. DATABASE RECORD
+            def save(record, issues):
+                writer.writerow(record)
+                if record['Status'] == "Review Required":
+                    issues_found.append(f"- {record['Student Name']}: {', '.join(issues) or 'Missing Contact Info'}")
+
+            for result in previous.values():
+                if result is not None:
+                    save(*result)
+            for job, (record, issues) in zip(todo, results):
+                save(record, issues)
+                if not any(i.startswith("File Error") for i in issues):  # unreadable: retried next run
+                    manifest.record(paths[job], [record, issues])
+                done += 1
+                if done % report_every == 0 or done == len(todo):
+                    db.flush()
+                    elapsed = time.perf_counter() - started
+                    print(f"  [{done}/{len(todo)}] {done / elapsed:.1f} CVs/s")
+    finally:
+        if pool:
+            pool.shutdown()
+        manifest.close()
+    elapsed = time.perf_counter() - started
 
     # 4. PRINT SUMMARY REPORT
     print("\n" + "=" * 40)
     print(" CV MANAGEMENT REPORT ")
     print("=" * 40)
-    print(f"Total CVs Processed: {len(db_records)}")
+    print(f"Total CVs:           {len(jobs)}")
+    print(f"Re-analysed:         {done} ({len(jobs) - done} unchanged)")
+    print(f"Workers:             {workers}")
+    print(f"Time:                {elapsed:.1f}s ({done / max(elapsed, 1e-9):.1f} CVs/s)")
     print(f"Database Updated:    {DATABASE_FILE}")
 
     if issues_found:
@@ -116,7 +173,11 @@ def run_manager():
     else:
         print("\n[+] All CVs pass basic quality checks!")
     print("=" * 40 + "\n")
+    print(instrument.finish())
 
 
 if __name__ == "__main__":
-    run_manager()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Standardize, audit and register the CVs in " + SOURCE_FOLDER)
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"parallel worker processes (this machine has {os.cpu_count()} cores)")
+    run_manager(parser.parse_args().workers)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import re
+
+# --- DEFAULT RUBRIC (used by app.py) ---
+DEFAULT_CRITERIA = {
+    "Personal Profile": ["profile", "summary", "objective", "about me", "career", "biography", "statement"],
+    "Personal Details": ["nationality", "date of birth", "gender", "marital status", "id number", "dob", "bio",
+                         "residence", "status"],
+    "Contact Info": ["email", "phone", "address", "contact", "cell", "telephone", "mobile", "p.o box", "tel"],
+    "Language Proficiency": ["language", "english", "swahili", "proficiency", "speak", "linguistic", "tongue"],
+    "Academic Qualification": ["academic", "education", "degree", "university", "school", "institution", "college",
+                               "kcse", "studies"],
+    "Professional Qualification": ["professional qualification", "certification", "certified", "accreditation",
+                                   "diploma", "member of", "registration"],
+    "Professional Experience": ["experience", "employment", "work history", "career", "professional background",
+                                "internship", "duties", "responsibilities"],
+    "Training & Workshops": ["training", "workshop", "seminar", "course", "participation", "conference"],
+    "Technical & Computer Literacy": ["computer", "literacy", "software", "ict", "digital", "packages", "office",
+                                      "excel", "word", "it skills"],
+    "Referees": ["referees", "references", "recommendation", "referee", "persons"]
+}
+
+# Contact patterns shared with cv.py (compiled once, not on every file)
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'\+?\d{10,15}')
+
+
+def normalize_text(text):
+    """Lowercases and collapses whitespace, the form every keyword is matched against."""
+    return " ".join(text.lower().split())
+
+
+class KeywordMatcher:
+    """
+    Checks a rubric against normalized text. Keywords are lowercased once, at
+    construction; each criterion is a C-level substring scan per keyword that
+    stops at its first hit (same result as `any(key in text)`).
+    """
+
+    def __init__(self, criteria):
+        self.criteria = {label: [word.lower() for word in words] for label, words in criteria.items()}
+        self.labels = list(self.criteria)
+
+    def find(self, text):
+        """Returns {label: (offset, keyword) of the first keyword found, or None} for the normalized text."""
+        offsets = {}
+        for label, words in self.criteria.items():
+            offsets[label] = None
+            for word in words:
+                at = text.find(word)
+                if at >= 0:
+                    offsets[label] = (at, word)
+                    break
+        return offsets
+
+    def audit(self, text):
+        """Returns the Found/Missing map plus the first match offset for each criterion."""
+        offsets = self.find(normalize_text(text))
+        results = {label: "✅ Found" if offsets[label] else "❌ Missing" for label in self.labels}
+        return results, offsets
+
+
+DEFAULT_MATCHER = KeywordMatcher(DEFAULT_CRITERIA)
+
+
+def score_audit(audit_results):
+    """Turns a Found/Missing map into the (score, detailed_report) pair stored in the database."""
+    found_count = sum(1 for v in audit_results.values() if v.startswith("✅"))
+    score = int((found_count / len(audit_results)) * 100)
+    detailed_report = " | ".join([f"{k}: {v}" for k, v in audit_results.items()])
+    return score, detailed_report
@@ -0,0 +1,68 @@
+import os
+import json
+import shutil
+import zipfile
+import threading
+
+# --- CV ZIP EXPORT ---
+# The archive is built on disk (never in memory) and cached next to a small
+# manifest of each file's size and mtime. Unchanged folder -> cached archive is
+# reused as-is; only new files -> they are appended; anything changed or
+# removed -> rebuilt. PDFs are already compressed, so they are stored, not deflated.
+CACHE_DIR = ".export_cache"
+
+_lock = threading.Lock()
+
+
+def _snapshot(folder_path):
+    files = {}
+    for root, dirs, names in os.walk(folder_path):
+        for name in names:
+            if name.endswith(".pdf"):
+                st = os.stat(os.path.join(root, name))
+                files[name] = [os.path.join(root, name), st.st_size, st.st_mtime_ns]
+    return files
+
+
+def _add(z, path, arcname):
+    # z.write copies the file in chunks, so memory stays flat
+    z.write(path, arcname, compress_type=zipfile.ZIP_STORED)
+
+
+def build_cv_zip(folder_path, cache_dir=CACHE_DIR):
+    """Returns the path of an up-to-date ZIP of every PDF in folder_path."""
+    os.makedirs(cache_dir, exist_ok=True)
+    zip_path = os.path.join(cache_dir, "CV_Collection.zip")
+    manifest_path = zip_path + ".json"
+
+    with _lock:
+        current = _snapshot(folder_path)
+        cached = {}
+        if os.path.exists(zip_path) and os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+
+        if cached and cached == current:
+            return zip_path
+
+        unchanged = all(current.get(name) == meta for name, meta in cached.items())
+        # Drop the manifest first so an interrupted update is rebuilt next time
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        # Written to a temp file and swapped in: a download of the previous
+        # archive (it may be served straight from disk) is never changed under it
+        tmp_path = zip_path + ".tmp"
+        if cached and unchanged:
+            shutil.copyfile(zip_path, tmp_path)  # a plain copy; nothing is recompressed
+            with zipfile.ZipFile(tmp_path, "a") as z:
+                for name in current.keys() - cached.keys():
+                    _add(z, current[name][0], name)
+        else:
+            with zipfile.ZipFile(tmp_path, "w") as z:
+                for name, (path, size, mtime) in current.items():
+                    _add(z, path, name)
+        os.replace(tmp_path, zip_path)
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(current, f)
+    return zip_path
@@ -0,0 +1,85 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import cv_store
+import pdf_text
+import instrument
+from cv_audit import DEFAULT_MATCHER, KeywordMatcher, score_audit
+
+# --- BACKGROUND AUDIT QUEUE ---
+# The portal saves the upload, records it as 'pending' and returns at once.
+# Text extraction + audit run here in worker processes; when a job finishes
+# its score is written back onto the submission row. A worker that dies (a
+# crash on a bad PDF, the OOM killer) breaks the pool, so a new one is started
+# on the next submit.
+MAX_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+_pool = None
+_pool_lock = threading.Lock()
+_resumed = set()
+_matchers = {}
+
+
+def _matcher_for(criteria):
+    if criteria is None:
+        return DEFAULT_MATCHER
+    key = tuple((label, tuple(words)) for label, words in criteria.items())
+    if key not in _matchers:
+        _matchers[key] = KeywordMatcher(criteria)
+    return _matchers[key]
+
+
+def audit_file(pdf_path, criteria=None):
+    """Worker: extracts the PDF text (once per page) and returns (score, detailed_report)."""
+    with instrument.span("pdf extract"):
+        pages = pdf_text.extract_pages(pdf_path, engine="pdfplumber")
+    raw_text = " ".join(t for t in pages if t)
+    with instrument.span("regex audit"):
+        audit_results, _ = _matcher_for(criteria).audit(raw_text)
+        return score_audit(audit_results)
+
+
+def _get_pool(broken=None):
+    """The shared pool; replaced if it is `broken` (sessions share it across threads)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool is broken:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        return _pool
+
+
+def submit(db_path, row_id, pdf_path, criteria=None):
+    """
+    Queues one audit; the result lands in the store when the worker finishes.
+    Returns False (and marks the row failed) if no worker pool could take it.
+    """
+    def _write_back(future):
+        try:
+            score, details = future.result()
+            cv_store.update_result(db_path, row_id, score, details, cv_store.DONE)
+        except Exception as e:
+            cv_store.update_result(db_path, row_id, None, f"Audit Error: {e}", cv_store.FAILED)
+
+    pool = _get_pool()
+    try:
+        future = pool.submit(audit_file, pdf_path, criteria)
+    except BrokenProcessPool:
+        try:
+            future = _get_pool(broken=pool).submit(audit_file, pdf_path, criteria)
+        except Exception as e:
+            cv_store.update_result(db_path, row_id, None, f"Audit Error: {e}", cv_store.FAILED)
+            return False
+    future.add_done_callback(_write_back)
+    return True
+
+
+def resume_pending(db_path, save_folder, criteria=None):
+    """Re-queues audits left 'pending' by a restart (once per store per process)."""
+    if db_path in _resumed:
+        return
+    _resumed.add(db_path)
+    for row_id, student_id in cv_store.pending_submissions(db_path):
+        submit(db_path, row_id, os.path.join(save_folder, f"{student_id}.pdf"), criteria)
@@ -0,0 +1,213 @@
+import os
+import json
+import sqlite3
+import pandas as pd
+
+# --- SUBMISSION STORE ---
+# One row per submit, appended in its own transaction. WAL mode lets the admin
+# dashboard read while students write, and the busy timeout makes concurrent
+# submits wait for each other instead of losing rows.
+COLUMNS = ["Name", "ID", "Score", "Audit_Details", "Timestamp", "Audit_Status"]
+
+# Audit_Status values: the audit runs in a background worker (see cv_jobs.py)
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name TEXT,
+    ID TEXT,
+    Score REAL,
+    Audit_Details TEXT,
+    Timestamp TEXT,
+    Extra TEXT,
+    Audit_Status TEXT DEFAULT 'done'
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_id ON submissions (ID);
+CREATE INDEX IF NOT EXISTS idx_submissions_name ON submissions (Name);
+CREATE INDEX IF NOT EXISTS idx_submissions_name_nocase ON submissions (Name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def connect(db_path, legacy_csv=None):
+    """Opens the store, creating it (and importing the old CSV once) if needed."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    if legacy_csv and os.path.exists(legacy_csv):
+        with conn:
+            # The marker insert takes the write lock, so only one session imports
+            cur = conn.execute("INSERT OR IGNORE INTO store_meta VALUES ('csv_imported', ?)", (legacy_csv,))
+            if cur.rowcount == 1:
+                import_csv(conn, legacy_csv)
+    return conn
+
+
+def _migrate(conn):
+    """Adds columns introduced after a store was first created."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(submissions)")}
+    if "Audit_Status" not in existing:
+        with conn:
+            conn.execute("ALTER TABLE submissions ADD COLUMN Audit_Status TEXT DEFAULT 'done'")
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_submissions_score ON submissions (Score)")
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return value
+
+
+def import_csv(conn, csv_path):
+    """
+    Imports the old cv_database.csv. It was written by both app.py and cv.py,
+    so 'Student Name' stands in for a missing 'Name' and any column the store
+    does not know about is kept as JSON in 'Extra'. Runs inside the caller's transaction.
+    """
+    df = pd.read_csv(csv_path, dtype={"ID": str})
+    rows = []
+    for rec in df.to_dict("records"):
+        rec = {k: _clean(v) for k, v in rec.items()}
+        if not rec.get("Name"):
+            rec["Name"] = rec.get("Student Name")
+        extra = {k: v for k, v in rec.items() if k not in COLUMNS and v is not None}
+        rows.append([rec.get(c) for c in COLUMNS[:5]] + [json.dumps(extra) if extra else None])
+    conn.executemany(
+        "INSERT INTO submissions (Name, ID, Score, Audit_Details, Timestamp, Extra) VALUES (?, ?, ?, ?, ?, ?)",
+        rows)
+    return len(rows)
+
+
+def append_submission(db_path, name, student_id, score, details, timestamp, legacy_csv=None, status=DONE):
+    """O(1) append of one submission; returns its row id."""
+    conn = connect(db_path, legacy_csv)
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO submissions (Name, ID, Score, Audit_Details, Timestamp, Audit_Status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (name, str(student_id), score, details, timestamp, status))
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def update_result(db_path, row_id, score, details, status=DONE):
+    """Writes a finished (or failed) background audit back onto its submission."""
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("UPDATE submissions SET Score = ?, Audit_Details = ?, Audit_Status = ? WHERE row_id = ?",
+                         (score, details, status, row_id))
+    finally:
+        conn.close()
+
+
+def pending_submissions(db_path):
+    """(row_id, ID) of every submission still waiting for its audit."""
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT row_id, ID FROM submissions WHERE Audit_Status = ?", (PENDING,)).fetchall()
+    finally:
+        conn.close()
+
+
+def find_latest(db_path, student_id):
+    """Most recent submission for an ID (indexed lookup), or None."""
+    conn = connect(db_path)
+    try:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM submissions WHERE ID = ? ORDER BY row_id DESC LIMIT 1",
+            (str(student_id),)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def reset(db_path):
+    """Deletes the store and its WAL side files."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+def stamp(db_path):
+    """Changes whenever the store is written (main file or WAL); used as a cache key."""
+    parts = []
+    for suffix in ("", "-wal"):
+        try:
+            st = os.stat(db_path + suffix)
+            parts.append((st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            parts.append(None)
+    return tuple(parts)
+
+
+SORTS = {
+    "Newest first": "row_id DESC",
+    "Oldest first": "row_id ASC",
+    "Score (high to low)": "Score DESC, row_id DESC",
+    "Score (low to high)": "Score ASC, row_id DESC",
+    "Name (A to Z)": "Name COLLATE NOCASE ASC, row_id DESC",
+}
+
+
+def _prefix_range(prefix):
+    # 'abc' -> ['abc', 'abd'): lets an index serve prefix searches
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _search_clause(search):
+    # Digits: the ID. Anything else: the Name compared under NOCASE, so that
+    # idx_submissions_name_nocase serves the range
+    if search.isdigit():
+        return "ID >= ? AND ID < ?"
+    return "Name COLLATE NOCASE >= ? AND Name COLLATE NOCASE < ?"
+
+
+def query_submissions(db_path, search="", min_score=None, max_score=None, status=None,
+                      sort="Newest first", page=1, page_size=25):
+    """
+    One page of submissions, filtered and sorted in SQLite. Digits search the ID,
+    anything else the Name (case-insensitive); both are prefix searches served by
+    an index. Returns (DataFrame, total matches).
+    """
+    where, params = [], []
+    search = (search or "").strip()
+    if search:
+        where.append(_search_clause(search))
+        params += _prefix_range(search.lower())
+    if min_score is not None:
+        where.append("Score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("Score <= ?")
+        params.append(max_score)
+    if status:
+        where.append("Audit_Status = ?")
+        params.append(status)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+    conn = connect(db_path)
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM submissions {clause}", params).fetchone()[0]
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(COLUMNS)} FROM submissions {clause} ORDER BY {SORTS[sort]} LIMIT ? OFFSET ?",
+            conn, params=params + [page_size, (page - 1) * page_size])
+        return df, total
+    finally:
+        conn.close()
+
+
+def status_counts(db_path):
+    """{Audit_Status: count} without loading the rows."""
+    conn = connect(db_path)
+    try:
+        return dict(conn.execute("SELECT Audit_Status, COUNT(*) FROM submissions GROUP BY Audit_Status").fetchall())
+    finally:
+        conn.close()
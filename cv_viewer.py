@@ -0,0 +1,103 @@
+import os
+import hmac
+import shutil
+import hashlib
+import secrets
+from urllib.parse import quote
+
+# --- SAME-ORIGIN CV LINKS & THUMBNAILS ---
+# Stored CVs reach the browser through Streamlit's own static file serving
+# (server.enableStaticServing in .streamlit/config.toml), so the browser's PDF
+# viewer pulls the file from disk with Range requests, over the app's own
+# origin and scheme, instead of the app pushing a base64 copy through the
+# websocket on every rerun. publish() hard-links the file (copies it where
+# links aren't possible) into <app dir>/static/cv/<secret>/, where <secret> is
+# derived from a key kept next to the static folder: the URL can't be guessed,
+# the folder is never listed, and a replaced CV gets a fresh name.
+STATIC_URL = "app/static"              # where Streamlit serves <app dir>/static/
+PUBLISH_DIR = "cv"
+KEY_FILE = ".cv_viewer.key"
+MAX_STATIC_BYTES = 200 * 1024 * 1024   # Streamlit won't serve larger static files
+THUMB_DIR = ".thumb_cache"
+
+_keys = {}
+
+
+def _key(static_dir):
+    path = os.path.join(os.path.dirname(os.path.abspath(static_dir)), KEY_FILE)
+    if path not in _keys:
+        if not os.path.exists(path):
+            with open(path + ".tmp", "wb") as f:
+                f.write(secrets.token_bytes(32))
+            os.replace(path + ".tmp", path)
+        with open(path, "rb") as f:
+            _keys[path] = f.read()
+    return _keys[path]
+
+
+def _digest(key, text, length):
+    return hmac.new(key, text.encode("utf-8"), hashlib.sha256).hexdigest()[:length]
+
+
+def publish(path, static_dir):
+    """
+    Same-origin URL (relative to the app page) that serves path from disk, or
+    None if the file is too large for Streamlit's static serving.
+    """
+    info = os.stat(path)
+    if info.st_size > MAX_STATIC_BYTES:
+        return None
+    key = _key(static_dir)
+    folder_id = _digest(key, os.path.abspath(path), 32)
+    name = f"{_digest(key, f'{info.st_size}|{info.st_mtime_ns}', 8)}-{os.path.basename(path)}"
+    folder = os.path.join(static_dir, PUBLISH_DIR, folder_id)
+    target = os.path.join(folder, name)
+    if not os.path.exists(target):
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)  # other filesystem, or no hard links
+        os.replace(tmp, target)
+        # Older versions of the same file
+        for old in os.listdir(folder):
+            if old != name:
+                os.remove(os.path.join(folder, old))
+    return f"{STATIC_URL}/{PUBLISH_DIR}/{folder_id}/{quote(name)}"
+
+
+def unpublish_all(static_dir):
+    """Removes every published copy (they are hard links, so deleting the originals isn't enough)."""
+    shutil.rmtree(os.path.join(static_dir, PUBLISH_DIR), ignore_errors=True)
+
+
+def file_url(folder, name, static_dir):
+    """URL of a stored CV for the admin view's link / iframe (see publish)."""
+    return publish(os.path.join(folder, name), static_dir)
+
+
+# --- THUMBNAILS ---
+def thumbnail(pdf_path, thumb_dir=THUMB_DIR, resolution=40):
+    """
+    PNG of the first page, rendered on first request and cached on disk by
+    file size and mtime. Returns its path, or None if the page can't be rendered.
+    """
+    info = os.stat(pdf_path)
+    key = hashlib.sha1(f"{os.path.abspath(pdf_path)}|{info.st_size}|{info.st_mtime_ns}|{resolution}"
+                       .encode("utf-8")).hexdigest()
+    out = os.path.join(thumb_dir, f"{key}.png")
+    if os.path.exists(out):
+        return out
+    try:
+        import pdfplumber
+        os.makedirs(thumb_dir, exist_ok=True)
+        with pdfplumber.open(pdf_path) as pdf:
+            if not pdf.pages:
+                return None
+            tmp = f"{out}.{os.getpid()}.tmp.png"
+            pdf.pages[0].to_image(resolution=resolution).save(tmp)
+        os.replace(tmp, out)
+        return out
+    except Exception:
+        return None
@@ -0,0 +1,283 @@
+import os
+import csv
+import time
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import file_manifest
+
+# --- CV INGESTION WATCHER ---
+# Long-running replacement for re-running cv.py / process_cvs.py by hand.
+# File events (inotify & co. through watchdog, or a polling fallback) are
+# debounced until a file has stopped growing, then the file alone is audited in
+# a bounded process pool. Its row is merged into the registry CSV and the shared
+# manifest, so the batch scripts skip it too.
+#   python cv_watch.py --target cv         (student_uploads -> cv_database.csv)
+#   python cv_watch.py --target registry   (submissions -> class_registry.csv)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+
+DEBOUNCE_SECONDS = 2.0   # a file must be quiet (and its size stable) this long
+POLL_SECONDS = 1.0       # fallback only: how often the folder's mtime is checked
+TICK = 0.25
+
+
+# --- TARGETS (the worker functions run in the pool) ---
+def _cv_job(student_name, filename):
+    import cv
+    return cv.build_record(student_name, filename)
+
+
+def _registry_job(filename):
+    import process_cvs
+    return process_cvs.audit_file(filename)
+
+
+class CvTarget:
+    scope = "cv.py"
+
+    def __init__(self):
+        import cv
+        self.cv = cv
+        self.folder, self.registry, self.key = cv.SOURCE_FOLDER, cv.DATABASE_FILE, "Filename"
+        self.fields = cv.FIELDS
+
+    def accepts(self, name):
+        return name.lower().endswith(".pdf")
+
+    def submit(self, pool, name):
+        # Renamed here, not in a worker, so uploads mapping to one name can't race;
+        # the rename's own file event is skipped by the manifest once recorded
+        student_name, filename = self.cv.standardize(name)
+        return filename, pool.submit(_cv_job, student_name, filename)
+
+    def row(self, result):
+        record, issues = result
+        return record, not any(i.startswith("File Error") for i in issues)
+
+
+class RegistryTarget:
+    scope = "process_cvs.py"
+
+    def __init__(self):
+        import process_cvs
+        self.folder, self.registry, self.key = process_cvs.SUBMISSION_DIR, process_cvs.DATABASE_FILE, "Student_File"
+        self.fields = process_cvs.REGISTRY_FIELDS
+
+    def accepts(self, name):
+        return name.endswith((".pdf", ".docx"))
+
+    def submit(self, pool, name):
+        return name, pool.submit(_registry_job, name)
+
+    def row(self, result):
+        return result, True
+
+
+TARGETS = {"cv": CvTarget, "registry": RegistryTarget}
+
+
+# --- EVENT SOURCES ---
+class Pending:
+    """Paths with recent events; a path is ready once quiet for DEBOUNCE_SECONDS at a stable size."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = {}
+
+    def touch(self, path):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        with self.lock:
+            self.items[path] = (time.monotonic(), size)
+
+    def ready(self, limit):
+        """(paths ready to process, at most limit; paths that no longer exist)."""
+        out, gone = [], []
+        now = time.monotonic()
+        with self.lock:
+            for path, (seen, size) in list(self.items.items()):
+                if now - seen < DEBOUNCE_SECONDS:
+                    continue
+                try:
+                    current = os.path.getsize(path)
+                except OSError:
+                    del self.items[path]  # deleted, or renamed away
+                    gone.append(path)
+                    continue
+                if current != size:
+                    self.items[path] = (now, current)  # still being written
+                elif len(out) < limit:
+                    del self.items[path]
+                    out.append(path)
+        return out, gone
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _start_watchdog(folder, pending):
+    class Handler(FileSystemEventHandler):
+        def on_created(self, event):
+            if not event.is_directory:
+                pending.touch(event.src_path)
+
+        on_modified = on_deleted = on_created
+
+        def on_moved(self, event):
+            if not event.is_directory:
+                pending.touch(event.src_path)
+                pending.touch(event.dest_path)
+
+    observer = Observer()
+    observer.schedule(Handler(), folder, recursive=False)
+    observer.start()
+    return observer
+
+
+class Poller:
+    """
+    Fallback: lists the folder only when its mtime moves (a file was added,
+    removed or renamed) and diffs the names; only new or vanished names are
+    looked at. Overwriting a file in place is only seen with watchdog.
+    """
+
+    def __init__(self, folder, pending):
+        self.folder, self.pending = folder, pending
+        self.folder_mtime = os.stat(folder).st_mtime_ns
+        self.seen = set(os.listdir(folder))
+        self.next_poll = 0.0
+
+    def poll(self):
+        if time.monotonic() < self.next_poll:
+            return
+        self.next_poll = time.monotonic() + POLL_SECONDS
+        mtime = os.stat(self.folder).st_mtime_ns
+        if mtime == self.folder_mtime:
+            return
+        self.folder_mtime = mtime
+        current = set(os.listdir(self.folder))
+        for name in current ^ self.seen:
+            self.pending.touch(os.path.join(self.folder, name))
+        self.seen = current
+
+
+# --- REGISTRY ---
+def _load_registry(target):
+    if not os.path.exists(target.registry):
+        return {}
+    rows, legacy = {}, 0
+    with open(target.registry, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get(target.key):
+                rows[row[target.key]] = row
+            else:
+                legacy += 1
+    if legacy:
+        # e.g. the portal's older mixed-header rows; the batch script drops them the same way
+        print(f"⚠️ {legacy} rows in {target.registry} have no '{target.key}' and are not carried over")
+    return rows
+
+
+def _save_registry(target, rows):
+    # Written to a temp file and swapped in, so readers never see half a CSV
+    tmp = f"{target.registry}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=target.fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows[k] for k in sorted(rows))
+    os.replace(tmp, target.registry)
+
+
+def watch(target_name="cv", workers=2, use_polling=False):
+    target = TARGETS[target_name]()
+    os.makedirs(target.folder, exist_ok=True)
+    manifest = file_manifest.Manifest(target.scope)
+    rows = _load_registry(target)
+    pending = Pending()
+
+    # Catch up once on whatever arrived while the watcher was down
+    for name in os.listdir(target.folder):
+        if target.accepts(name) and manifest.unchanged(os.path.join(target.folder, name)) is None:
+            pending.touch(os.path.join(target.folder, name))
+
+    if HAS_WATCHDOG and not use_polling:
+        observer, poller = _start_watchdog(target.folder, pending), None
+        print(f"👀 Watching {target.folder} (filesystem events), {workers} workers")
+    else:
+        observer, poller = None, Poller(target.folder, pending)
+        print(f"👀 Watching {target.folder} (polling every {POLL_SECONDS}s), {workers} workers")
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    inflight = {}  # future -> (path, started)
+    handled = {}   # path -> (size, mtime_ns) it was processed at in this session
+    try:
+        while True:
+            time.sleep(TICK)
+            if poller:
+                poller.poll()
+
+            # At most two queued jobs per worker; the rest wait in `pending`
+            busy = {path for path, _ in inflight.values()}
+            ready, gone = pending.ready(limit=2 * workers - len(inflight))
+            changed = False
+            for path in gone:
+                manifest.forget(path)
+                if rows.pop(os.path.basename(path), None) is not None:
+                    changed = True
+                    print(f"🗑️ {os.path.basename(path)} removed")
+            for path in ready:
+                name = os.path.basename(path)
+                path = os.path.join(target.folder, name)
+                if not target.accepts(name) or not os.path.exists(path):
+                    continue
+                if path in busy:
+                    pending.touch(path)  # changed while being processed: look again afterwards
+                    continue
+                info = os.stat(path)
+                if handled.get(path) == (info.st_size, info.st_mtime_ns) or manifest.unchanged(path) is not None:
+                    continue  # e.g. the event of cv.py's own rename, or a touch
+                filename, future = target.submit(pool, name)
+                inflight[future] = (os.path.join(target.folder, filename), time.perf_counter())
+
+            for future in [f for f in inflight if f.done()]:
+                path, started = inflight.pop(future)
+                name = os.path.basename(path)
+                if os.path.exists(path):
+                    info = os.stat(path)
+                    handled[path] = (info.st_size, info.st_mtime_ns)
+                try:
+                    row, cacheable = target.row(future.result())
+                except Exception as e:
+                    print(f"❌ {name}: {e}")
+                    continue
+                rows[row[target.key]] = row
+                if cacheable and os.path.exists(path):
+                    manifest.record(path, future.result())
+                changed = True
+                print(f"✅ {name} ({time.perf_counter() - started:.1f}s, {len(pending)} waiting)")
+            if changed:
+                _save_registry(target, rows)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping watcher...")
+    finally:
+        if observer:
+            observer.stop()
+            observer.join()
+        pool.shutdown()
+        manifest.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit CVs as soon as they land in the upload folder")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="cv")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--poll", action="store_true", help="use polling even if watchdog is installed")
+    args = parser.parse_args()
+    watch(args.target, args.workers, args.poll)
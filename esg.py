@@ -1,48 +1,84 @@
+import io
 import streamlit as st
-import requests
+import wb_store
+import esg_trends
+import st_cache
+import instrument
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import plotly.express as px
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(page_title="Global ESG Gap Tracker", layout="wide", page_icon="🌍")
 
+instrument.start("esg")
+
 # Initialize Search History
 if 'history' not in st.session_state:
     st.session_state.history = []
 
 
 # --- 2. DATA FETCHING LOGIC ---
-def fetch_world_bank_data(country_code, indicator):
-    if not country_code or len(country_code) < 2:
-        return None, None
-
-    # per_page=50 ensures we look back deep enough into history
-    url = f"https://api.worldbank.org/v2/country/{country_code}/indicator/{indicator}?format=json&per_page=50"
-
-    try:
-        response = requests.get(url, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
-            # Handle API errors or empty results
-            if isinstance(data[0], dict) and 'message' in data[0]:
-                return None, None
-            if len(data) > 1 and isinstance(data[1], list):
-                for entry in data[1]:
-                    if entry['value'] is not None:
-                        return round(entry['value'], 2), entry['date']
-    except Exception:
-        pass
-    return None, None
+# Cached per (countries, indicator, target) until the store gets new data; the
+# TTL makes sure the store's own staleness check still runs now and then.
+@st_cache.cache_data("world bank data", ttl=wb_store.TTL_SECONDS, max_entries=100)
+def _gap_table(codes, indicator, target, data_stamp):
+    # Served from the local store (wb_store.py); missing series are fetched in parallel
+    gap_df = wb_store.latest_values(codes, indicator)
+    gap_df["value"] = gap_df["value"].round(2)
+    gap_df["Target"] = target
+    gap_df["Gap"] = (gap_df["value"] - target).round(2)
+    return gap_df.rename(columns={"iso2": "Country", "iso3": "ISO3", "name": "Name",
+                                  "year": "Year", "value": "Value"})
+
+
+def fetch_gap_table(codes, indicator, target):
+    """
+    One row per country with its latest value, the year, and the gap to target.
+    Everything downstream (map, bar chart, CSV) is built from this single DataFrame.
+    """
+    return _gap_table(tuple(codes), indicator, target, wb_store.last_fetched(indicator))
+
+
+# --- FIGURES (rebuilt only when their data changes) ---
+@st_cache.cache_data("map figures", max_entries=50)
+def build_gap_map(gap_df, selected_metric):
+    fig_map = px.choropleth(
+        gap_df,
+        locations="ISO3",
+        color="Gap",
+        hover_name="Name",
+        hover_data=["Value", "Year", "Gap"],
+        color_continuous_scale=px.colors.sequential.Reds if "CO2" in selected_metric else px.colors.sequential.Greens,
+        projection="natural earth",
+        title=f"Regional Gap Analysis: {selected_metric}"
+    )
+    fig_map.update_geos(showcountries=True, countrycolor="LightGrey")
+    return fig_map
+
+
+@st_cache.cache_data("bar charts", max_entries=50)
+def build_bar_chart(bar_df, target_val, selected_metric):
+    """The chart as PNG bytes. A Figure of its own (not pyplot), so sessions never share one."""
+    fig_bar = Figure(figsize=(10, 5))
+    ax = fig_bar.subplots()
+    ax.bar(bar_df["Country"].tolist() + ["Target"], bar_df["Value"].tolist() + [target_val],
+           color=['#3498db'] * len(bar_df) + ['#2ecc71'])
+    ax.set_ylabel(selected_metric)
+    ax.tick_params(axis="x", labelrotation=90 if len(bar_df) > 10 else 0)
+    png = io.BytesIO()
+    fig_bar.savefig(png, format="png", bbox_inches="tight")
+    return png.getvalue()
 
 
 # --- 3. SIDEBAR: SEARCH SETTINGS ---
 with st.sidebar:
     st.header("🌍 Global Search")
-    st.write("Enter 2-letter codes (e.g., US, TZ, IN, CN).")
-
-    c1 = st.text_input("First Country Code", "US").upper().strip()
-    c2 = st.text_input("Second Country Code", "TZ").upper().strip()
+    all_countries = st.checkbox("Compare all economies (~200)")
+    st.write("Enter 2-letter codes separated by commas (e.g., US, TZ, IN, CN).")
+    codes_text = st.text_input("Country Codes", "US, TZ", disabled=all_countries)
+    codes = [wb_store.ALL] if all_countries else \
+        list(dict.fromkeys(c.strip().upper() for c in codes_text.split(",") if c.strip()))
 
     metrics = {
         "CO2 Emissions (Metric Tons Per Capita)": "EN.ATM.CO2E.PC",
@@ -61,57 +97,47 @@ with st.sidebar:
     for item in st.session_state.history[-5:]:
         st.caption(f"• {item}")
 
+    with st.expander("⚡ Cache Performance"):
+        st.dataframe(st_cache.hit_rates(), use_container_width=True)
+        st.dataframe(instrument.rows(), use_container_width=True)
+
 # --- 4. MAIN INTERFACE ---
 st.title("🌱 Sustainability & ESG Gap Analysis Tool")
 st.markdown("This tool calculates the **Sustainability Gap** and visualizes it on a global scale.")
 
 if st.button("Run Global Analysis"):
-    if not c1 or not c2:
-        st.error("⚠️ Please enter both country codes before analyzing.")
+    if not codes:
+        st.error("⚠️ Please enter at least one country code before analyzing.")
     else:
         with st.spinner('Querying World Bank Global Database...'):
-            v1, y1 = fetch_world_bank_data(c1, indicator_code)
-            v2, y2 = fetch_world_bank_data(c2, indicator_code)
-
-        if v1 is not None and v2 is not None:
+            try:
+                with instrument.span("world bank data"):
+                    gap_df = fetch_gap_table(codes, indicator_code, target_val)
+            except Exception as e:
+                st.error(f"⚠️ World Bank request failed: {e}")
+                gap_df = pd.DataFrame()
+
+        label = "All economies" if all_countries else " vs ".join(codes)
+        if not gap_df.empty:
             # Update History
-            search_key = f"{c1} vs {c2} ({selected_metric})"
+            search_key = f"{label} ({selected_metric})"
             if search_key not in st.session_state.history:
                 st.session_state.history.append(search_key)
 
-            # --- SECTION 1: KEY METRICS ---
-            col1, col2 = st.columns(2)
-            gap1 = round(v1 - target_val, 2)
-            gap2 = round(v2 - target_val, 2)
-
             # Inverse color for CO2 (negative gap is good), normal for others
             d_color = "inverse" if "CO2" in selected_metric else "normal"
 
-            col1.metric(f"{c1} ({y1})", v1, delta=gap1, delta_color=d_color)
-            col2.metric(f"{c2} ({y2})", v2, delta=gap2, delta_color=d_color)
+            # --- SECTION 1: KEY METRICS (only readable for a handful of countries) ---
+            if len(gap_df) <= 6:
+                for col, row in zip(st.columns(len(gap_df)), gap_df.itertuples()):
+                    col.metric(f"{row.Country} ({row.Year})", row.Value, delta=row.Gap, delta_color=d_color)
 
             # --- SECTION 2: THE MAP ---
             st.divider()
             st.subheader("🗺️ Global Gap Map")
 
-            map_df = pd.DataFrame({
-                'CountryCode': [c1, c2],
-                'MetricValue': [v1, v2],
-                'Gap': [gap1, gap2]
-            })
-
-            fig_map = px.choropleth(
-                map_df,
-                locations="CountryCode",
-                color="Gap",
-                hover_name="CountryCode",
-                hover_data=["MetricValue", "Gap"],
-                color_continuous_scale=px.colors.sequential.Reds if "CO2" in selected_metric else px.colors.sequential.Greens,
-                projection="natural earth",
-                title=f"Regional Gap Analysis: {selected_metric}"
-            )
-
-            fig_map.update_geos(showcountries=True, countrycolor="LightGrey")
+            with instrument.span("map figure"):
+                fig_map = build_gap_map(gap_df, selected_metric)
             st.plotly_chart(fig_map, use_container_width=True)
 
             # --- SECTION 3: STATISTICAL CHART & DOWNLOAD ---
@@ -120,36 +146,53 @@ if st.button("Run Global Analysis"):
 
             with col_chart:
                 st.subheader("📊 Bar Comparison")
-                fig_bar, ax = plt.subplots(figsize=(10, 5))
-                ax.bar([c1, c2, "Target"], [v1, v2, target_val], color=['#3498db', '#e67e22', '#2ecc71'])
-                ax.set_ylabel(selected_metric)
-                st.pyplot(fig_bar)
+                # With many countries, show the 15 furthest from and 15 closest to the target
+                bar_df = gap_df.sort_values("Gap")
+                if len(bar_df) > 30:
+                    bar_df = pd.concat([bar_df.head(15), bar_df.tail(15)])
+                with instrument.span("bar chart"):
+                    fig_bar = build_bar_chart(bar_df, target_val, selected_metric)
+                st.image(fig_bar, use_container_width=True)
 
             with col_down:
                 st.subheader("📥 Download Data")
                 # Create DataFrame for CSV
-                export_df = pd.DataFrame({
-                    "Country": [c1, c2],
-                    "Year": [y1, y2],
-                    "Metric": [selected_metric, selected_metric],
-                    "Value": [v1, v2],
-                    "Target": [target_val, target_val],
-                    "Gap": [gap1, gap2]
-                })
+                export_df = gap_df[["Country", "Name", "Year", "Value", "Target", "Gap"]].assign(Metric=selected_metric)
 
                 csv = export_df.to_csv(index=False).encode('utf-8')
 
                 st.download_button(
                     label="Download Results as CSV",
                     data=csv,
-                    file_name=f"esg_report_{c1}_{c2}.csv",
+                    file_name=f"esg_report_{'all' if all_countries else '_'.join(codes)}.csv",
                     mime="text/csv",
                 )
                 st.write("The CSV includes the current data values, target goals, and calculated gaps.")
 
+            # --- SECTION 4: FULL TIME SERIES, TREND & PROJECTION ---
+            st.divider()
+            st.subheader("📈 Trend & Target Projection")
+            with instrument.span("trends"):
+                series_df, trend_df = esg_trends.compute_trends(
+                    codes, {indicator_code: target_val}, {indicator_code: "CO2" not in selected_metric})
+            if not trend_df.empty:
+                if len(gap_df) <= 10:
+                    fig_line = px.line(series_df.dropna(subset=["value"]), x="year", y="value", color="iso2",
+                                       labels={"year": "Year", "value": selected_metric, "iso2": "Country"})
+                    fig_line.add_hline(y=target_val, line_dash="dash", line_color="#2ecc71",
+                                       annotation_text="Target")
+                    st.plotly_chart(fig_line, use_container_width=True)
+                st.dataframe(trend_df.drop(columns=["Indicator"]), use_container_width=True)
+                st.caption("Trend = linear fit over every reported year. Projected Year = when that trend "
+                           "line reaches the target.")
+
+            missing = [] if all_countries else \
+                [c for c in codes if c not in set(gap_df["Country"]) | set(gap_df["ISO3"])]
+            for c in missing:
+                st.error(f"❌ Could not find data for '{c}'.")
+
         else:
-            if v1 is None: st.error(f"❌ Could not find data for '{c1}'.")
-            if v2 is None: st.error(f"❌ Could not find data for '{c2}'.")
+            st.error(f"❌ Could not find data for '{label}'.")
             st.warning("Hint: Try common codes like US, IN, CN, DE, or BR.")
 
 st.divider()
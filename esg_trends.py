@@ -0,0 +1,92 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import wb_store
+
+# --- TREND & TARGET PROJECTION (vectorized) ---
+# Series are pivoted into one year x (indicator, country) NumPy matrix, and the
+# linear trend, CAGR and projected target year are computed for every column at
+# once with masked array sums -- no per-country Python loops.
+
+
+def series_matrix(long_df):
+    """Long (indicator, iso2, year, value) rows -> year x (indicator, iso2) float matrix."""
+    return long_df.pivot_table(index="year", columns=["indicator", "iso2"], values="value",
+                               aggfunc="last").sort_index().astype(float)
+
+
+def trend_stats(matrix, targets, higher_is_better):
+    """
+    One row per (indicator, iso2): latest year/value, OLS slope per year, CAGR,
+    and the year the trend line reaches the target ('met' already / NaN = never).
+    targets and higher_is_better are dicts keyed by indicator.
+    """
+    years = matrix.index.to_numpy(dtype=float)
+    y = matrix.to_numpy()
+    mask = ~np.isnan(y)
+    x = np.where(mask, years[:, None], 0.0)
+    yv = np.where(mask, y, 0.0)
+
+    n = mask.sum(axis=0)
+    sx, sy = x.sum(axis=0), yv.sum(axis=0)
+    sxy, sxx = (x * yv).sum(axis=0), (x * x).sum(axis=0)
+    denom = n * sxx - sx ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denom != 0, (n * sxy - sx * sy) / denom, np.nan)
+        intercept = (sy - slope * sx) / n
+
+    # First and last observed year/value in each column
+    has_data = mask.any(axis=0)
+    first_idx = mask.argmax(axis=0)
+    last_idx = len(years) - 1 - mask[::-1].argmax(axis=0)
+    cols = np.arange(y.shape[1])
+    first_year, last_year = years[first_idx], years[last_idx]
+    first_val, last_val = y[first_idx, cols], y[last_idx, cols]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        span = last_year - first_year
+        cagr = np.where((first_val > 0) & (last_val > 0) & (span > 0),
+                        (last_val / first_val) ** (1 / span) - 1, np.nan)
+
+    indicators = matrix.columns.get_level_values("indicator")
+    target = indicators.map(targets).to_numpy(dtype=float)
+    higher = indicators.map(higher_is_better).to_numpy(dtype=bool)
+
+    met = np.where(higher, last_val >= target, last_val <= target)
+    moving_toward = np.where(higher, slope > 0, slope < 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reach = np.ceil((target - intercept) / slope)
+    reach = np.where(moving_toward & ~met, np.maximum(reach, last_year), np.nan)
+
+    out = pd.DataFrame({
+        "Indicator": indicators,
+        "Country": matrix.columns.get_level_values("iso2"),
+        "Latest Year": last_year.astype(int),
+        "Latest Value": np.round(last_val, 2),
+        "Trend / Year": np.round(slope, 3),
+        "CAGR %": np.round(cagr * 100, 2),
+        "Target": target,
+        "Projected Year": reach,
+    })
+    out["Status"] = np.select([met, ~np.isnan(reach)], ["✅ Met", "📈 On track"], "⚠️ Not on track")
+    return out[has_data].reset_index(drop=True)
+
+
+@lru_cache(maxsize=64)
+def _cached_trends(indicators, codes, targets, higher_is_better, data_stamp):
+    frames = [wb_store.get_series(list(codes), ind).assign(indicator=ind) for ind in indicators]
+    long_df = pd.concat(frames, ignore_index=True)
+    if long_df.empty:
+        return long_df, pd.DataFrame()
+    return long_df, trend_stats(series_matrix(long_df), dict(targets), dict(higher_is_better))
+
+
+def compute_trends(codes, targets, higher_is_better):
+    """
+    (long series DataFrame, trend table) for the countries and {indicator: target}.
+    Memoized per (indicators, countries, targets) until the store gets new data.
+    """
+    indicators = tuple(sorted(targets))
+    stamp = tuple(wb_store.last_fetched(ind) for ind in indicators)
+    return _cached_trends(indicators, tuple(codes), tuple(sorted(targets.items())),
+                          tuple(sorted(higher_is_better.items())), stamp)
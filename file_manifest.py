@@ -0,0 +1,73 @@
+import os
+import json
+import time
+import sqlite3
+import pdf_text
+
+# --- SHARED INPUT MANIFEST ---
+# The batch scripts (cv.py, process_cvs.py, check_script.py) record every input
+# they processed: path, size, mtime, SHA-256 and the result they produced.
+# On the next run a file whose size and mtime are unchanged is skipped without
+# being read; if only the mtime moved, the hash decides. Each script keeps its
+# own entries (scope) in the one SQLite file.
+MANIFEST_FILE = ".file_manifest.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    scope TEXT, path TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT,
+    result TEXT, processed_at REAL,
+    PRIMARY KEY (scope, path)
+)
+"""
+
+
+class Manifest:
+    def __init__(self, scope, db_path=MANIFEST_FILE):
+        self.scope = scope
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+
+    def unchanged(self, path):
+        """The stored result if path still has the content it was processed with, else None."""
+        path = os.path.normpath(path)
+        row = self.conn.execute("SELECT size, mtime_ns, sha256, result FROM files WHERE scope = ? AND path = ?",
+                                (self.scope, path)).fetchone()
+        if row is None:
+            return None
+        info = os.stat(path)
+        size, mtime_ns, sha256, result = row
+        if info.st_size != size:
+            return None
+        if info.st_mtime_ns != mtime_ns:
+            # Touched (copied, re-saved...): only a different hash means new content
+            if pdf_text.file_sha256(path) != sha256:
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE files SET mtime_ns = ? WHERE scope = ? AND path = ?",
+                                  (info.st_mtime_ns, self.scope, path))
+        return json.loads(result)
+
+    def record(self, path, result):
+        """Stores the result of processing path along with its current fingerprint."""
+        path = os.path.normpath(path)
+        info = os.stat(path)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (self.scope, path, info.st_size, info.st_mtime_ns, pdf_text.file_sha256(path),
+                               json.dumps(result, default=str), time.time()))
+
+    def forget(self, path):
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE scope = ? AND path = ?", (self.scope, os.path.normpath(path)))
+
+    def prune(self, paths):
+        """Forgets entries whose files are no longer among paths (deleted or renamed away)."""
+        keep = {os.path.normpath(p) for p in paths}
+        stored = [p for (p,) in self.conn.execute("SELECT path FROM files WHERE scope = ?", (self.scope,))]
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE scope = ? AND path = ?",
+                                  [(self.scope, p) for p in stored if p not in keep])
+
+    def close(self):
+        self.conn.close()
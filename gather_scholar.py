@@ -1,34 +1,41 @@
+import csv
 from scholarly import scholarly
-import pandas as pd
+import scholar_harvest
+
+OUTPUT_FILE = "scholar_summary.csv"
+FIELDS = ["Title", "Year", "Link", "Snippet"]
 
 # 1. SETTINGS
 topic = input("Enter your Research Topic: ")
 num_to_find = int(input("How many papers to find (e.g. 50)? "))
 
-results = []
-print(f"🔎 Searching Google Scholar for: {topic}...")
 
-# 2. SEARCH
-search_query = scholarly.search_pubs(topic)
+def to_row(paper):
+    # Extract only what we need
+    bib = paper.get('bib', {})
+    return {
+        "Title": bib.get('title', 'N/A'),
+        "Year": bib.get('pub_year', 'N/A'),
+        "Link": paper.get('pub_url', 'No Link'),
+        "Snippet": bib.get('abstract', 'No abstract available')
+    }
+
 
-for i in range(num_to_find):
-    try:
-        paper = next(search_query)
-        # Extract only what we need
-        data = {
-            "Title": paper['bib'].get('title', 'N/A'),
-            "Year": paper['bib'].get('pub_year', 'N/A'),
-            "Link": paper.get('pub_url', 'No Link'),
-            "Snippet": paper['bib'].get('abstract', 'No abstract available')
-        }
-        results.append(data)
-        print(f"[{i+1}/{num_to_find}] Found: {data['Title'][:60]}...")
-    except StopIteration:
-        break
-    except Exception as e:
-        print(f"⚠️ Skipping a result due to error.")
+# 2. SEARCH (cached per query and rank; an interrupted run resumes where it stopped)
+cache = scholar_harvest.ResultCache()
+found = cached = 0
+with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
+    writer = csv.DictWriter(f, fieldnames=FIELDS)
+    writer.writeheader()
+    for rank, data, from_cache in scholar_harvest.harvest(
+            topic, num_to_find, lambda q, start: scholarly.search_pubs(q, start_index=start), to_row, cache):
+        # 3. SAVE each row as soon as it arrives
+        writer.writerow(data)
+        f.flush()
+        found += 1
+        cached += from_cache
+        if not from_cache:
+            print(f"[{rank + 1}/{num_to_find}] Found: {data['Title'][:60]}...")
+cache.close()
 
-# 3. SAVE
-df = pd.DataFrame(results)
-df.to_csv("scholar_summary.csv", index=False)
-print("\n✅ DONE! Links and snippets saved to 'scholar_summary.csv'")
\ No newline at end of file
+print(f"\n✅ DONE! {found} links and snippets ({cached} from cache) saved to '{OUTPUT_FILE}'")
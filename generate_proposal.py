@@ -2,6 +2,11 @@ import os
 import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
+import context_pack
+
+# Roughly the old 15000-character cut, but in whole analyses
+CONTEXT_BUDGET = 3500
+FOCUS = "research gap methodology limitation problem statement"
 
 # 1. Load your API Key
 load_dotenv()
@@ -17,7 +22,8 @@ except FileNotFoundError:
 
 # 3. COMBINE THE ANALYSES
 # We take the text from the 'Analysis' column to give to the AI
-summary_of_gaps = " ".join(df['Analysis'].astype(str))
+# (deduplicated, most relevant first, never cut mid-analysis)
+summary_of_gaps = context_pack.build_context(df['Analysis'].astype(str).tolist(), FOCUS, CONTEXT_BUDGET)
 
 print("Generating your Research Proposal... please wait.")
 
@@ -27,7 +33,7 @@ try:
         model="gpt-4o", # Stronger model for writing
         messages=[
             {"role": "system", "content": "You are a PhD supervisor and expert academic writer."},
-            {"role": "user", "content": f"Based on these research paper analyses, write a professional Research Problem Statement and suggest a Thesis Title. Focus on a gap that hasn't been filled. DATA: {summary_of_gaps[:15000]}"}
+            {"role": "user", "content": f"Based on these research paper analyses, write a professional Research Problem Statement and suggest a Thesis Title. Focus on a gap that hasn't been filled. DATA: {summary_of_gaps}"}
         ]
     )
 
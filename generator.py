@@ -1,10 +1,32 @@
-import pandas as pd
-import ollama
+import llm_cache
+import context_pack
+import vector_index
 
-# 1. LOAD DATA
+PROMPT_VERSION = "tz-proposal-v1"
+MODEL_NAME = 'deepseek-r1:1.5b'
+# Literature context is packed into this many tokens (smaller = faster first token)
+CONTEXT_BUDGET = 3000
+# Analyses retrieved from the local index (most relevant to TOPIC first)
+TOP_K = 12
+TOPIC = "Communication as a Source of Knowledge in Tanzania, Agricultural and Health Information Systems"
+
+
+def summarize(text):
+    """Map step: condenses a batch of analyses that does not fit the budget."""
+    response = llm_cache.chat(model=MODEL_NAME, messages=[{'role': 'user', 'content': (
+        "Summarise the key knowledge-sharing findings and gaps in these analyses in under 150 words:\n" + text)}],
+        template="tz-summary-v1")
+    return response['message']['content']
+
+
+# 1. LOAD DATA (only the analyses closest to the topic, from the local index)
 try:
-    df = pd.read_csv("tanzania_knowledge_analysis.csv")
-    knowledge_data = "\n".join(df['AI_Analysis'].tolist())
+    vector_index.sync_csv("tanzania_knowledge_analysis.csv")
+    hits = vector_index.search(TOPIC, k=TOP_K, sources=["tanzania_knowledge_analysis.csv"])
+    if not hits:
+        raise FileNotFoundError("no analyses indexed yet")
+    knowledge_data = context_pack.build_context([h['text'] for h in hits], TOPIC, CONTEXT_BUDGET,
+                                                summarize=summarize)
 except Exception as e:
     print(f"❌ Error: Could not find the analysis file. {e}")
     exit()
@@ -31,10 +53,12 @@ REQUIRED SECTIONS:
 
 # 3. RUN AI (Using the fast 1.5b model)
 print("🚀 Synthesizing your Tanzanian research into a formal proposal...")
-response = ollama.chat(model='deepseek-r1:1.5b', messages=[{'role': 'user', 'content': prompt}])
+response = llm_cache.chat(model=MODEL_NAME, messages=[{'role': 'user', 'content': prompt}],
+                          template=PROMPT_VERSION)
 
 # 4. SAVE TO FILE
 with open("Tanzania_Knowledge_Proposal.txt", "w", encoding="utf-8") as f:
     f.write(response['message']['content'])
 
-print("\n✨ SUCCESS! Open 'Tanzania_Knowledge_Proposal.txt' to see your draft.")
\ No newline at end of file
+print("\n✨ SUCCESS! Open 'Tanzania_Knowledge_Proposal.txt' to see your draft.")
+print(llm_cache.summary())
\ No newline at end of file
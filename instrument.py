@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# --- TIMING SPANS, COUNTERS & PROFILING ---
+# `with span("pdf extract"):` times a block. Every finished span is appended to
+# TRACE_FILE as one JSON line (run, pid, stage, start, seconds, items) by the
+# process that ran it, so work done in pool workers is traced too; the run's
+# process picks those lines up incrementally for its stats. finish() adds a
+# summary line for the run (per-stage count, latency percentiles, items/sec,
+# counters) and returns it as text to print. The file is rotated to
+# TRACE_FILE.1 by whichever process finds it over TRACE_MAX_BYTES. In memory
+# each stage keeps exact call / item totals but only its last SPAN_WINDOW
+# spans for the latency stats, so a long-lived Streamlit server does not grow
+# with every rerun.
+#   TRACE=0          keep the numbers in memory only
+#   PROFILE=cpu      cProfile the main thread, saved to <run name>.prof
+#   PROFILE=mem      tracemalloc peak and top allocation sites in the summary
+TRACE_FILE = os.getenv("TRACE_FILE", ".trace.jsonl")
+TRACE = os.getenv("TRACE", "1") == "1"
+PROFILE = {p.strip() for p in os.getenv("PROFILE", "").lower().split(",") if p.strip()}
+TRACE_MAX_BYTES = 50 * 1024 * 1024  # rotated to TRACE_FILE.1 past this
+ROTATE_CHECK = 200                  # writes between size / rotation checks
+SPAN_WINDOW = 5000                  # spans per stage kept for the stats
+
+counters = {}
+_spans = {}   # stage -> deque of (start time, seconds, items) recorded in this process
+_remote = {}  # the same, for spans other processes wrote for this run
+_totals = {}  # stage -> [calls, items], both sources, never trimmed
+_lock = threading.Lock()
+_read_lock = threading.Lock()
+_run = {"id": os.getenv("TRACE_RUN"), "name": None, "started": None, "cpu": None}
+_out = {"pid": None, "file": None, "writes": 0}
+# How far this process has read the trace, and its rotated predecessor (other
+# processes may append a few more lines there before they notice the rotation)
+_tail = {"ino": None, "offset": 0, "old_ino": None, "old_offset": 0}
+
+
+def _open_trace():
+    if _out["file"] is not None and _out["pid"] == os.getpid():
+        _out["file"].close()
+    _out["file"] = open(TRACE_FILE, "a", encoding="utf-8", buffering=1)
+    _out["pid"], _out["writes"] = os.getpid(), 0
+
+
+def _write(record):
+    if not (TRACE and _run["id"]):
+        return
+    with _lock:
+        # Forked workers inherit the parent's handle; each process opens its own
+        if _out["pid"] != os.getpid():
+            _open_trace()
+        elif _out["writes"] >= ROTATE_CHECK:
+            try:
+                info = os.stat(TRACE_FILE)
+                if info.st_size > TRACE_MAX_BYTES:
+                    os.replace(TRACE_FILE, TRACE_FILE + ".1")
+                    _open_trace()
+                elif info.st_ino != os.fstat(_out["file"].fileno()).st_ino:
+                    _open_trace()  # another process rotated it
+            except OSError:
+                _open_trace()  # removed
+            _out["writes"] = 0
+        _out["file"].write(json.dumps(record) + "\n")
+        _out["writes"] += 1
+
+
+def start(name):
+    """Starts a traced run (once per process; later calls are no-ops, e.g. Streamlit reruns)."""
+    if _run["started"] is not None:
+        return _run["id"]
+    _run["name"], _run["started"] = name, time.time()
+    _run["id"] = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    os.environ["TRACE_RUN"] = _run["id"]  # spawned worker processes pick it up
+    if TRACE and os.path.exists(TRACE_FILE):
+        if os.path.getsize(TRACE_FILE) > TRACE_MAX_BYTES:
+            os.replace(TRACE_FILE, TRACE_FILE + ".1")
+        else:
+            # Earlier runs' lines are never needed: start reading at the end
+            info = os.stat(TRACE_FILE)
+            _tail["ino"], _tail["offset"] = info.st_ino, info.st_size
+    if "cpu" in PROFILE:
+        import cProfile
+        _run["cpu"] = cProfile.Profile()
+        _run["cpu"].enable()
+    if "mem" in PROFILE:
+        import tracemalloc
+        tracemalloc.start()
+    return _run["id"]
+
+
+@contextmanager
+def span(stage, items=1):
+    """Times the block as one `stage` event covering `items` items (e.g. rows written)."""
+    started, t0 = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        with _lock:
+            _spans.setdefault(stage, deque(maxlen=SPAN_WINDOW)).append((started, seconds, items))
+            _add_total(stage, items)
+        _write({"type": "span", "run": _run["id"], "pid": os.getpid(), "stage": stage,
+                "start": round(started, 6), "seconds": round(seconds, 6), "items": items})
+
+
+def _add_total(stage, items):
+    total = _totals.setdefault(stage, [0, 0])
+    total[0] += 1
+    total[1] += items
+
+
+def count(name, n=1):
+    with _lock:
+        counters[name] = counters.get(name, 0) + n
+
+
+def _percentile(values, q):
+    # Nearest rank on sorted values
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def stage_stats(spans=None):
+    """
+    {stage: count, items, p50/p90/p99/max in ms, total seconds, items per second}.
+    For the run's own spans, count and items are exact and the rest covers the
+    last SPAN_WINDOW spans of each stage.
+    """
+    totals = {}
+    if spans is None:
+        spans = _all_spans()
+        with _lock:
+            totals = {stage: list(total) for stage, total in _totals.items()}
+    out = {}
+    for stage, entries in spans.items():
+        seconds = sorted(s for _, s, _ in entries)
+        items = sum(i for _, _, i in entries)
+        # Throughput over the stage's wall-clock window, so overlapping work counts once
+        window = max(t + s for t, s, _ in entries) - min(t for t, _, _ in entries)
+        calls, all_items = totals.get(stage, (len(entries), items))
+        out[stage] = {"count": calls, "items": all_items,
+                      "p50_ms": round(_percentile(seconds, 50) * 1000, 1),
+                      "p90_ms": round(_percentile(seconds, 90) * 1000, 1),
+                      "p99_ms": round(_percentile(seconds, 99) * 1000, 1),
+                      "max_ms": round(seconds[-1] * 1000, 1),
+                      "total_s": round(sum(seconds), 3),
+                      "items_per_s": round(items / window, 2) if window > 0 else None}
+    return out
+
+
+def rows():
+    """The run's stages (this process and its pool workers) as rows for st.dataframe."""
+    return [{"Stage": stage, "Calls": s["count"], "p50 ms": s["p50_ms"], "p90 ms": s["p90_ms"],
+             "p99 ms": s["p99_ms"], "Max ms": s["max_ms"], "Items/s": s["items_per_s"]}
+            for stage, s in stage_stats().items()]
+
+
+def _read(path, ino, offset_key):
+    """Parses the lines of path added since the last read, if it is still the file being followed."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_ino != ino:
+                return
+            f.seek(_tail[offset_key])
+            data = f.read()
+    except OSError:
+        return
+    data = data[:data.rfind(b"\n") + 1]  # a half-written last line waits for the next read
+    _tail[offset_key] += len(data)
+    run = _run["id"].encode("utf-8")
+    for line in data.splitlines():
+        if run not in line:
+            continue
+        try:
+            r = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if r.get("type") == "span" and r["pid"] != os.getpid():
+            _remote.setdefault(r["stage"], deque(maxlen=SPAN_WINDOW)).append((r["start"], r["seconds"], r["items"]))
+            with _lock:
+                _add_total(r["stage"], r["items"])
+
+
+def _collect():
+    """Picks up the spans other processes (pool workers) appended to the trace for this run."""
+    if not (TRACE and _run["id"]):
+        return
+    with _read_lock:
+        try:
+            current = os.stat(TRACE_FILE).st_ino
+        except OSError:
+            return
+        if _tail["ino"] not in (None, current):
+            # Rotated since the last read: keep following the old file as TRACE_FILE.1
+            _tail["old_ino"], _tail["old_offset"] = _tail["ino"], _tail["offset"]
+            _tail["offset"] = 0
+        _tail["ino"] = current
+        if _tail["old_ino"] is not None:
+            _read(TRACE_FILE + ".1", _tail["old_ino"], "old_offset")
+        _read(TRACE_FILE, current, "offset")
+
+
+def _all_spans():
+    _collect()
+    with _lock:
+        spans = {stage: list(entries) for stage, entries in _spans.items()}
+    with _read_lock:
+        for stage, entries in _remote.items():
+            spans.setdefault(stage, []).extend(entries)
+    return spans
+
+
+def finish():
+    """Stops the profilers, writes the run summary to the trace and returns it as text."""
+    if _run["started"] is None:
+        return "⏱️ No timings recorded"
+    elapsed = time.time() - _run["started"]
+    stats = stage_stats()
+    summary = {"type": "summary", "run": _run["id"], "name": _run["name"], "seconds": round(elapsed, 3),
+               "stages": stats, "counters": dict(counters)}
+
+    lines = [f"⏱️ Timings for {_run['id']} ({elapsed:.1f}s):"]
+    for stage, s in sorted(stats.items(), key=lambda kv: -kv[1]["total_s"]):
+        rate = f"{s['items_per_s']:.1f}/s" if s["items_per_s"] else "-"
+        lines.append(f"   {stage:<20} n={s['count']:<6} p50 {s['p50_ms']:>8.1f}ms  p90 {s['p90_ms']:>8.1f}ms"
+                     f"  p99 {s['p99_ms']:>8.1f}ms  total {s['total_s']:>8.1f}s  {rate}")
+    if counters:
+        lines.append("   " + ", ".join(f"{name}: {n}" for name, n in counters.items()))
+
+    if _run["cpu"] is not None:
+        _run["cpu"].disable()
+        path = f"{_run['name']}.prof"
+        _run["cpu"].dump_stats(path)
+        summary["cpu_profile"] = path
+        lines.append(f"   cProfile saved to {path} (python -m pstats {path})")
+        _run["cpu"] = None
+    if "mem" in PROFILE:
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            top = tracemalloc.take_snapshot().statistics("lineno")[:5]
+            tracemalloc.stop()
+            summary["mem_peak_mb"] = round(peak / 1e6, 1)
+            summary["mem_top"] = [{"site": str(s.traceback), "mb": round(s.size / 1e6, 2)} for s in top]
+            lines.append(f"   Peak traced memory {peak / 1e6:.1f} MB; largest live allocations:")
+            lines += [f"     {s.size / 1e6:.2f} MB  {s.traceback}" for s in top]
+
+    _write(summary)
+    return "\n".join(lines)
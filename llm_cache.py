@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import ollama
+
+# --- SHARED OLLAMA CLIENT WITH PERSISTENT MEMO CACHE ---
+# Drop-in for ollama.chat(): the same (model, prompt template version, messages)
+# is answered from disk instead of being re-inferred. The cache is an LRU
+# bounded to MAX_ENTRIES rows; set LLM_CACHE_BYPASS=1 (or bypass=True) to force
+# fresh answers. Failed calls raise as before and are never cached.
+CACHE_FILE = os.getenv("LLM_CACHE_FILE", ".llm_cache.db")
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+stats = {"hits": 0, "misses": 0}
+
+
+def _connect():
+    conn = sqlite3.connect(CACHE_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY, model TEXT, template TEXT, content TEXT, last_used REAL)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+    return conn
+
+
+def cache_key(model, messages, template):
+    input_hash = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{model}|{template}|{input_hash}"
+
+
+def _lookup(key):
+    conn = _connect()
+    try:
+        with conn:
+            row = conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def _store(key, model, template, content):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                         (key, model, template, content, time.time()))
+            # Evict least recently used rows beyond the size bound
+            conn.execute("""DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)""", (MAX_ENTRIES,))
+    finally:
+        conn.close()
+
+
+def _as_response(content):
+    return {"message": {"role": "assistant", "content": content}}
+
+
+def chat(model, messages, template="v1", bypass=False):
+    """Cached ollama.chat(); returns the same {'message': {'content': ...}} shape."""
+    key = cache_key(model, messages, template)
+    if not (bypass or BYPASS):
+        cached = _lookup(key)
+        if cached is not None:
+            stats["hits"] += 1
+            return _as_response(cached)
+    stats["misses"] += 1
+    content = ollama.chat(model=model, messages=messages)['message']['content']
+    _store(key, model, template, content)
+    return _as_response(content)
+
+
+async def achat(client, model, messages, template="v1", bypass=False):
+    """Cached chat() for an ollama.AsyncClient."""
+    key = cache_key(model, messages, template)
+    if not (bypass or BYPASS):
+        cached = _lookup(key)
+        if cached is not None:
+            stats["hits"] += 1
+            return _as_response(cached)
+    stats["misses"] += 1
+    content = (await client.chat(model=model, messages=messages))['message']['content']
+    _store(key, model, template, content)
+    return _as_response(content)
+
+
+def summary():
+    total = stats["hits"] + stats["misses"]
+    rate = (stats["hits"] / total * 100) if total else 0.0
+    return f"LLM cache: {stats['hits']} hits, {stats['misses']} misses ({rate:.0f}% hit rate)"
@@ -1,54 +1,150 @@
 import os
+import json
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from pypdf import PdfReader
+import paper_sections
 import ollama
+import llm_cache
+import checkpoint
+import instrument
+import vector_index
 
 # --- SETTINGS ---
 PDF_FOLDER = "papers"
 OUTPUT_FILE = "local_research_analysis.csv"
-# Using 1.5b to stop your CPU from overheating and speed up the process
-MODEL_NAME = "deepseek-r1:1.5b"
+# Every finished paper is appended here; folded into OUTPUT_FILE at the end
+CHECKPOINT_FILE = "local_research_analysis.jsonl"
+# Using 1.5b to stop your CPU from overheating and speed up the process;
+# OLLAMA_MODEL tries another one (compare the "llm" timings the run prints)
+MODEL_NAME = os.getenv("OLLAMA_MODEL", "deepseek-r1:1.5b")
+# Bump when the prompt wording changes so cached answers are not reused
+PROMPT_VERSION = "gap-v2"
+# Point at ollama_stub.py (e.g. http://127.0.0.1:11435) to test without a model
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+# Requests in flight at once; raise it if Ollama runs with OLLAMA_NUM_PARALLEL > 1
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "2"))
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
 
 
 def extract_text(pdf_path):
-    """Stronger text extraction that handles 'broken' PDF objects."""
+    """
+    The paper's most relevant (section, text) chunks, or a "Skip: ..." string.
+    Pages are parsed lazily and reading stops at the reference list.
+    """
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        # Try to read the first 8 pages (sufficient for gaps)
-        pages_to_read = min(len(reader.pages), 8)
-
-        for i in range(pages_to_read):
-            page_text = reader.pages[i].extract_text()
-            if page_text:
-                text += page_text + "\n"
+        # Cached across runs; pages after the last one read are never parsed
+        with instrument.span("pdf extract"):
+            chunks = paper_sections.read(pdf_path)
 
         # Final check if text was actually found
-        if len(text.strip()) < 100:
+        if sum(len(text.strip()) for _, text in chunks) < 100:
             return "Skip: Scanned image or unreadable formatting."
 
-        return text
+        return paper_sections.select(chunks)
     except Exception as e:
         return f"Skip: Error reading file ({str(e)})"
 
 
-def analyze_with_local_ai(text):
-    """Sends text to local DeepSeek-R1 and gets research gaps."""
-    # Shorten the prompt and context to make it faster for the CPU
-    prompt = f"""Identify the core Methodology and one specific Research Gap in this text.
-    Be concise.
+async def _ask(client, prompt, template, limit, stage="llm"):
+    async with limit:
+        with instrument.span(stage):
+            response = await llm_cache.achat(client, MODEL_NAME, [
+                {'role': 'user', 'content': prompt}
+            ], template=template)
+    return response['message']['content']
 
-    TEXT: {text[:4000]}"""
 
+async def analyze_with_local_ai(client, chunks, limit):
+    """
+    Sends the chosen chunks to local DeepSeek-R1 and gets research gaps.
+    Map: short notes per chunk, in parallel. Reduce: one answer from the notes.
+    """
+    question = "Identify the core Methodology and one specific Research Gap in this text.\n    Be concise."
     try:
-        response = ollama.chat(model=MODEL_NAME, messages=[
-            {'role': 'user', 'content': prompt}
-        ])
-        return response['message']['content']
+        if len(chunks) == 1:
+            return await _ask(client, f"{question}\n\n    TEXT: {chunks[0][1]}", PROMPT_VERSION, limit)
+
+        notes = await asyncio.gather(*(_ask(client, f"""Note in 2-3 sentences any methodology, limitations or open problems
+    stated in this part ("{section}") of a research paper. Write "none" if there are none.
+
+    TEXT: {text}""", PROMPT_VERSION + "-map", limit, "llm map") for section, text in chunks))
+        joined = "\n\n".join(f"[{section}] {note}" for (section, _), note in zip(chunks, notes))
+        return await _ask(client, f"{question}\n\n    NOTES ON THE PAPER'S SECTIONS:\n{joined}", PROMPT_VERSION, limit,
+                          "llm reduce")
     except Exception as e:
         return f"AI Error: {e}"
 
 
+def load_results():
+    """Previous results keyed by file: the last CSV plus anything checkpointed since."""
+    results = {}
+    if os.path.exists(OUTPUT_FILE):
+        for r in pd.read_csv(OUTPUT_FILE).to_dict('records'):
+            results[r['File']] = r['Analysis']
+    if os.path.exists(CHECKPOINT_FILE):
+        checkpoint.repair(CHECKPOINT_FILE)  # the next run appends after the last whole line
+        with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                results[r['File']] = r['Analysis']
+    return results
+
+
+def save_results(results):
+    """Writes the full CSV once and clears the checkpoint it now contains."""
+    rows = [{"File": f, "Analysis": a} for f, a in results.items()]
+    pd.DataFrame(rows, columns=["File", "Analysis"]).to_csv(OUTPUT_FILE + ".tmp", index=False)
+    os.replace(OUTPUT_FILE + ".tmp", OUTPUT_FILE)
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+
+
+async def run_pipeline(todo, results):
+    """
+    Extraction (process pool) and inference (AI_CONCURRENCY requests) overlap:
+    extracted papers wait in a small queue while earlier ones are being analysed.
+    """
+    loop = asyncio.get_running_loop()
+    client = ollama.AsyncClient(host=OLLAMA_HOST)
+    queue = asyncio.Queue(maxsize=AI_CONCURRENCY * 2)
+    # Shared by every request, so a paper's parallel map calls count against it too
+    limit = asyncio.Semaphore(AI_CONCURRENCY)
+
+    async def producer(pool):
+        pending = {filename: loop.run_in_executor(pool, extract_text, os.path.join(PDF_FOLDER, filename))
+                   for filename in todo}
+        for filename, fut in pending.items():
+            await queue.put((filename, await fut))
+        for _ in range(AI_CONCURRENCY):
+            await queue.put(None)
+
+    async def worker(checkpoint):
+        while (item := await queue.get()) is not None:
+            filename, chunks = item
+            if isinstance(chunks, str):
+                analysis = chunks  # "Skip: ..."
+                instrument.count("papers skipped")
+            else:
+                sections = ", ".join(section for section, _ in chunks)
+                print(f"   🧠 DeepSeek is thinking about {filename} ({sections})...")
+                with instrument.span("paper"):
+                    analysis = await analyze_with_local_ai(client, chunks, limit)
+                instrument.count("papers analysed")
+
+            results[filename] = analysis
+            checkpoint.write(json.dumps({"File": filename, "Analysis": analysis}) + "\n")
+            checkpoint.flush()
+            print(f"   💾 Saved: {filename}")
+
+    with ProcessPoolExecutor(max_workers=EXTRACT_WORKERS) as pool, \
+            open(CHECKPOINT_FILE, "a", encoding="utf-8") as checkpoint:
+        await asyncio.gather(producer(pool), *(worker(checkpoint) for _ in range(AI_CONCURRENCY)))
+
+
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
     if not os.path.exists(PDF_FOLDER):
@@ -58,46 +154,23 @@ if __name__ == "__main__":
 
     files = [f for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf")]
 
-    # Load or create results list
-    if os.path.exists(OUTPUT_FILE):
-        results = pd.read_csv(OUTPUT_FILE).to_dict('records')
-        processed_files = {r['File'] for r in results if "Skip" not in str(r['Analysis'])}
-        print(f"⏩ Found existing CSV. Resuming with {len(files) - len(processed_files)} papers left.")
-    else:
-        results = []
-        processed_files = set()
-
-    print(f"🚀 Processing {len(files)} papers...")
-
-    for filename in files:
-        if filename in processed_files:
-            continue
-
-        print(f"📄 Reading: {filename}...")
-        full_path = os.path.join(PDF_FOLDER, filename)
-
-        # 1. Extract and Analyze
-        raw_text = extract_text(full_path)
-
-        if "Skip:" in raw_text:
-            analysis = raw_text
-        else:
-            print(f"   🧠 DeepSeek is thinking...")
-            analysis = analyze_with_local_ai(raw_text)
-
-        # 2. Update results list
-        # If the file was previously skipped, update it; otherwise, add it.
-        found = False
-        for r in results:
-            if r['File'] == filename:
-                r['Analysis'] = analysis
-                found = True
-                break
-        if not found:
-            results.append({"File": filename, "Analysis": analysis})
-
-        # 3. LIVE SAVE
-        pd.DataFrame(results).to_csv(OUTPUT_FILE, index=False)
-        print(f"   💾 Saved progress.")
-
-    print(f"\n✅ FINISHED! Check {OUTPUT_FILE}")
\ No newline at end of file
+    # Load previous results (CSV + checkpoint) so interrupted runs resume
+    results = load_results()
+    processed_files = {f for f, a in results.items() if "Skip" not in str(a)}
+    todo = [f for f in files if f not in processed_files]
+    if results:
+        print(f"⏩ Found existing results. Resuming with {len(todo)} papers left.")
+
+    print(f"🚀 Processing {len(files)} papers ({AI_CONCURRENCY} at a time)...")
+    instrument.start("main")
+    asyncio.run(run_pipeline(todo, results))
+    with instrument.span("csv save", items=len(results)):
+        save_results(results)
+    # Only new or changed analyses / papers are embedded
+    with instrument.span("index sync"):
+        added = vector_index.sync_csv(OUTPUT_FILE) + vector_index.sync_papers(PDF_FOLDER)
+    print(f"🗂️ Search index updated ({added} new entries)")
+
+    print(f"\n✅ FINISHED! Check {OUTPUT_FILE}")
+    print(llm_cache.summary())
+    print(instrument.finish())
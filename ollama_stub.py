@@ -0,0 +1,43 @@
+import os
+import json
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# --- LOCAL OLLAMA STAND-IN ---
+# Answers /api/chat like Ollama does (non-streaming), so the pipelines can be
+# tested end to end without a model:
+#   python ollama_stub.py
+#   OLLAMA_HOST=http://127.0.0.1:11435 python main.py
+PORT = int(os.getenv("STUB_PORT", "11435"))
+# Simulated inference time per request, in seconds
+DELAY = float(os.getenv("STUB_DELAY", "0.2"))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+        time.sleep(DELAY)
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        reply = {
+            "model": body.get("model", "stub"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": f"Stub analysis ({len(prompt)} prompt chars)."},
+            "done": True,
+        }
+        data = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    print(f"🤖 Ollama stub listening on http://127.0.0.1:{PORT}")
+    ThreadingHTTPServer(("127.0.0.1", PORT), StubHandler).serve_forever()
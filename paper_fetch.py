@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import crawler
+import file_manifest
+
+# --- CONCURRENT PAPER DOWNLOADER ---
+# PDFs are fetched on a bounded thread pool over one keep-alive session, with
+# a rate limiter per host. A download goes to <file>.part first and, if it is
+# interrupted, continues from where it stopped with an HTTP Range request.
+# papers/manifest.json records every paper by arXiv ID (version stripped) with
+# its file, size and SHA-256: IDs already in the manifest are skipped, and a
+# file whose checksum matches one already stored is dropped as a duplicate.
+# PDFs already in the folder but not in the manifest (e.g. saved under the old
+# "<title>.pdf" names) are adopted in place when their name or checksum matches.
+MANIFEST_NAME = "manifest.json"
+DOWNLOAD_WORKERS = 4
+HOST_RATE = 2.0        # requests per second per host
+ATTEMPTS = 3
+CHUNK = 256 * 1024
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def base_id(arxiv_id):
+    """'2401.01234v2' -> '2401.01234' (every version is the same paper)."""
+    return re.sub(r"v\d+$", "", arxiv_id)
+
+
+def safe_filename(title, arxiv_id):
+    # The ID keeps names unique even when two titles share their first 50 characters
+    clean_title = "".join(x for x in title if x.isalnum() or x in " -_")[:50].strip()
+    return f"{clean_title} [{arxiv_id.replace('/', '_')}].pdf"
+
+
+def legacy_filename(title):
+    # auto_search.py's naming before the ID was added
+    return "".join(x for x in title if x.isalnum() or x in " -_")[:50] + ".pdf"
+
+
+def _limiter(url):
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = crawler.RateLimiter(HOST_RATE)
+        return _limiters[host]
+
+
+def load_manifest(folder):
+    path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(folder, manifest):
+    path = os.path.join(folder, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _untracked(folder, manifest):
+    """{file: sha256} of the PDFs in folder no manifest entry points at (hashes cached by size and mtime)."""
+    tracked = {entry["file"] for entry in manifest.values()}
+    hashes = file_manifest.Manifest("paper_fetch.py")
+    try:
+        found = {}
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if name.endswith(".pdf") and name not in tracked and os.path.isfile(path):
+                digest = hashes.unchanged(path)
+                if digest is None:
+                    digest = _sha256(path)
+                    hashes.record(path, digest)
+                found[name] = digest
+        return found
+    finally:
+        hashes.close()
+
+
+def _entry(paper, filename, folder, digest):
+    return {"id": paper["arxiv_id"], "title": paper["title"], "file": filename, "url": paper["pdf_url"],
+            "size": os.path.getsize(os.path.join(folder, filename)), "sha256": digest,
+            "downloaded_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def download(session, url, dest, timeout=60):
+    """Downloads url to dest, resuming a leftover dest.part. Returns bytes transferred."""
+    part = dest + ".part"
+    transferred = 0
+    for attempt in range(1, ATTEMPTS + 1):
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"Range": f"bytes={have}-"} if have else {}
+        _limiter(url).wait()
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+                if r.status_code == 416:
+                    break  # the .part already holds the whole file
+                r.raise_for_status()
+                # 200 means the server ignored the Range header: start over
+                with open(part, "ab" if r.status_code == 206 else "wb") as f:
+                    for chunk in r.iter_content(CHUNK):
+                        f.write(chunk)
+                        transferred += len(chunk)
+            break
+        except Exception:
+            if attempt == ATTEMPTS:
+                raise  # the .part stays on disk for the next run
+            time.sleep(attempt)
+    with open(part, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            os.remove(part)
+            raise ValueError("response is not a PDF")
+    os.replace(part, dest)
+    return transferred
+
+
+def download_all(papers, folder="papers", workers=DOWNLOAD_WORKERS, log=print):
+    """
+    papers: dicts with arxiv_id, title, pdf_url. Downloads the ones not in the
+    manifest yet and returns counts {'downloaded', 'skipped', 'duplicates', 'failed', 'bytes'}.
+    """
+    os.makedirs(folder, exist_ok=True)
+    manifest = load_manifest(folder)
+    by_hash = {entry["sha256"]: key for key, entry in manifest.items()}
+    counts = {"downloaded": 0, "skipped": 0, "duplicates": 0, "failed": 0, "bytes": 0}
+    untracked = _untracked(folder, manifest)
+    untracked_by_hash = {digest: name for name, digest in untracked.items()}
+
+    todo, queued, adopted = [], set(), 0
+    for paper in papers:
+        key = base_id(paper["arxiv_id"])
+        entry = manifest.get(key)
+        legacy = legacy_filename(paper["title"])
+        if key in queued or (entry and os.path.exists(os.path.join(folder, entry["file"]))):
+            counts["skipped"] += 1
+        elif legacy in untracked:
+            # Downloaded before the manifest existed: keep that file under its name
+            digest = untracked.pop(legacy)
+            untracked_by_hash.pop(digest, None)
+            manifest[key] = _entry(paper, legacy, folder, digest)
+            by_hash.setdefault(digest, key)
+            queued.add(key)
+            counts["skipped"] += 1
+            adopted += 1
+        else:
+            queued.add(key)
+            todo.append(paper)
+    if adopted:
+        _save_manifest(folder, manifest)
+        log(f"📎 {adopted} papers already in {folder} were added to the manifest")
+
+    session = crawler.make_session(workers)
+    started = time.perf_counter()
+
+    def fetch(paper):
+        filename = safe_filename(paper["title"], base_id(paper["arxiv_id"]))
+        size = download(session, paper["pdf_url"], os.path.join(folder, filename))
+        return paper, filename, size
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, p): p for p in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            paper = futures[future]
+            try:
+                paper, filename, size = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                log(f"⚠️ Could not download {paper['title']}: {e}")
+                continue
+            path = os.path.join(folder, filename)
+            digest = _sha256(path)
+            key = base_id(paper["arxiv_id"])
+            # Manifest updates happen here only (this thread), after each file
+            counts["bytes"] += size
+            original = by_hash.get(digest)
+            if original and original != key and os.path.exists(os.path.join(folder, manifest[original]["file"])):
+                # Same bytes under another ID: keep one copy, point both entries at it
+                os.remove(path)
+                filename = manifest[original]["file"]
+                counts["duplicates"] += 1
+            elif digest in untracked_by_hash:
+                # Same bytes as a file already in the folder under another name: adopt that one
+                os.remove(path)
+                filename = untracked_by_hash.pop(digest)
+                untracked.pop(filename, None)
+                by_hash[digest] = key
+                counts["duplicates"] += 1
+            else:
+                by_hash[digest] = key
+                counts["downloaded"] += 1
+            manifest[key] = _entry(paper, filename, folder, digest)
+            _save_manifest(folder, manifest)
+            log(f"[{i}/{len(todo)}] ⬇️ {paper['title']}")
+
+    elapsed = time.perf_counter() - started
+    if todo:
+        log(f"📦 {counts['bytes'] / 1e6:.1f} MB in {elapsed:.1f}s ({counts['bytes'] / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+    return counts
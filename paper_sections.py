@@ -0,0 +1,108 @@
+import re
+import pdf_text
+
+# --- SECTION-AWARE CHUNKING FOR PAPERS ---
+# Pages are read one at a time and split into ~CHUNK_CHARS chunks on paragraph
+# boundaries, each tagged with the section heading it falls under. Reading
+# stops at the reference list (or MAX_PAGES). Chunks are scored by a cheap
+# heuristic (section weight + gap/method cue words) and the best MAX_CHUNKS
+# are kept in document order; the opening chunk (title, abstract) always is.
+CHUNK_CHARS = 2500
+MIN_CHUNK_CHARS = 400     # smaller pieces (a title, a stray line) join the next section
+MAX_CHUNKS = 3
+MAX_PAGES = 20
+PAGE_BATCH = 3            # pages parsed per step while reading
+
+SECTION_WEIGHTS = [
+    (re.compile(r"abstract|summary"), 3.0),
+    (re.compile(r"limitation|future (work|research|direction)|research gap|open (problem|question)"), 3.0),
+    (re.compile(r"method|research design|materials|data collection|approach|study design"), 2.5),
+    (re.compile(r"discussion|conclusion"), 2.0),
+    (re.compile(r"result|finding|evaluation"), 1.0),
+    (re.compile(r"introduction|background"), 0.8),
+    (re.compile(r"related work|literature review|prior work"), 0.3),
+]
+STOP_RE = re.compile(r"references|bibliography|works cited|acknowledg")
+HEADING_RE = re.compile(
+    r"^\s*(?:(?:\d{1,2}|[IVX]{1,4})(?:\.\d{1,2})*\.?\s+)?([A-Z][A-Za-z ,&/-]{2,60}?)\s*:?\s*$")
+CUE_RE = re.compile(r"\b(limitation|gap|future|lack|not (?:yet )?(?:been )?(?:studied|addressed|explored)"
+                    r"|we propose|method|survey|interview|dataset|sample|case study|framework)", re.IGNORECASE)
+
+
+def section_weight(heading):
+    heading = heading.lower()
+    for pattern, weight in SECTION_WEIGHTS:
+        if pattern.search(heading):
+            return weight
+    return 0.5
+
+
+def _heading(line):
+    """The heading text if the line looks like a section heading, else None."""
+    if len(line) > 70:
+        return None
+    match = HEADING_RE.match(line)
+    if not match:
+        return None
+    text = match.group(1).strip()
+    # A known section name, or a short numbered / all-caps line
+    if section_weight(text) != 0.5 or STOP_RE.search(text.lower()):
+        return text
+    if line.strip()[0].isdigit() or text.isupper():
+        return text if len(text.split()) <= 6 else None
+    return None
+
+
+def chunk_pages(pages, max_pages=MAX_PAGES, chunk_chars=CHUNK_CHARS):
+    """
+    Consumes page texts (any iterable, read lazily) and returns [(section, text)]
+    chunks up to the reference list. Pages after it are never requested.
+    """
+    chunks, section, buf, size = [], "Opening", [], 0
+
+    def flush():
+        text = "\n".join(buf).strip()
+        if text:
+            chunks.append((section, text))
+        buf.clear()
+        return 0
+
+    for page_no, page in enumerate(pages):
+        if page_no >= max_pages:
+            break
+        for line in (page or "").splitlines():
+            heading = _heading(line)
+            if heading:
+                if STOP_RE.search(heading.lower()) and page_no > 0:
+                    flush()
+                    return chunks
+                if size >= MIN_CHUNK_CHARS:
+                    size = flush()
+                section = heading
+                continue
+            buf.append(line)
+            size += len(line) + 1
+            # Close the chunk at a paragraph break past the size, or hard at 1.5x
+            if (size >= chunk_chars and not line.strip()) or size >= chunk_chars * 1.5:
+                size = flush()
+    flush()
+    return chunks
+
+
+def read(pdf_path, engine="pypdf"):
+    """chunk_pages over a PDF, parsing (and caching) only the pages it reads."""
+    return chunk_pages(pdf_text.iter_pages(pdf_path, engine=engine, batch=PAGE_BATCH))
+
+
+def score(section, text):
+    cues = len(CUE_RE.findall(text)) / max(1, len(text) / 1000)
+    return section_weight(section) + min(cues, 3.0) * 0.5
+
+
+def select(chunks, max_chunks=MAX_CHUNKS):
+    """The opening chunk plus the highest-scoring others, in document order."""
+    if len(chunks) <= max_chunks:
+        return chunks
+    ranked = sorted(range(1, len(chunks)), key=lambda i: score(*chunks[i]), reverse=True)
+    keep = sorted([0] + ranked[:max_chunks - 1])
+    return [chunks[i] for i in keep]
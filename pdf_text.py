@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+
+# --- SHARED TEXT EXTRACTION (with on-disk cache) ---
+# Every script that reads PDFs goes through extract_pages(). Results are cached
+# under the SHA-256 of the file bytes plus the extractor name and version, so a
+# re-run over an unchanged folder never parses a PDF twice, and upgrading the
+# extractor library invalidates the old text automatically.
+CACHE_DIR = ".text_cache"
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _pypdf(path, start, stop):
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    count = len(reader.pages)
+    return count, [reader.pages[i].extract_text() or "" for i in range(start, min(stop, count))]
+
+
+def _pdfplumber(path, start, stop):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        count = len(pdf.pages)
+        return count, [pdf.pages[i].extract_text() or "" for i in range(start, min(stop, count))]
+
+
+def _markitdown(path, start, stop):
+    # MarkItDown converts the whole document (PDF or DOCX) into one text block
+    from markitdown import MarkItDown
+    return 1, [MarkItDown().convert(path).text_content]
+
+
+EXTRACTORS = {
+    "pypdf": (_pypdf, "pypdf"),
+    "pdfplumber": (_pdfplumber, "pdfplumber"),
+    "markitdown": (_markitdown, "markitdown"),
+}
+
+
+@lru_cache(maxsize=None)
+def _version(module_name):
+    try:
+        from importlib.metadata import version
+        return version(module_name)
+    except Exception:
+        return "unknown"
+
+
+def _cache_path(path, engine, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    key = f"{file_sha256(path)}_{engine}-{_version(EXTRACTORS[engine][1])}"
+    return os.path.join(cache_dir, key + ".json")
+
+
+def _load(cache_path):
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"page_count": None, "pages": []}
+
+
+def _extend(path, engine, cache_path, entry, stop):
+    """Parses pages len(entry['pages']) .. stop-1 and saves the grown entry."""
+    count, new_pages = EXTRACTORS[engine][0](path, len(entry["pages"]), stop)
+    entry = {"page_count": count, "pages": entry["pages"] + new_pages}
+    tmp_path = cache_path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, cache_path)
+    return entry
+
+
+def extract_pages(path, engine="pypdf", max_pages=None, cache_dir=CACHE_DIR):
+    """
+    Returns the text of each page ('' for pages without text), at most max_pages.
+    Only pages not already in the cache are parsed.
+    """
+    cache_path = _cache_path(path, engine, cache_dir)
+    entry = _load(cache_path)
+
+    wanted = entry["page_count"] if max_pages is None else max_pages
+    if entry["page_count"] is not None:
+        wanted = min(wanted, entry["page_count"])
+    if entry["page_count"] is None or len(entry["pages"]) < wanted:
+        stop = max_pages if max_pages is not None else float("inf")
+        entry = _extend(path, engine, cache_path, entry, stop)
+
+    return entry["pages"][:max_pages]
+
+
+def iter_pages(path, engine="pypdf", batch=2, cache_dir=CACHE_DIR):
+    """
+    Yields the text of each page in order, parsing `batch` pages at a time only
+    when the caller asks for more, so stopping early leaves the rest unparsed.
+    """
+    cache_path = _cache_path(path, engine, cache_dir)
+    entry = _load(cache_path)
+    i = 0
+    while True:
+        if i == len(entry["pages"]):
+            if entry["page_count"] is not None and i >= entry["page_count"]:
+                return
+            entry = _extend(path, engine, cache_path, entry, i + batch)
+            if i == len(entry["pages"]):
+                return
+        yield entry["pages"][i]
+        i += 1
@@ -1,6 +1,7 @@
 import os
 import pandas as pd
-from markitdown import MarkItDown
+import pdf_text
+import file_manifest
 from pydantic import BaseModel, EmailStr, ValidationError
 from typing import List
 
@@ -8,6 +9,7 @@ from typing import List
 SUBMISSION_DIR = "./submissions"
 CLEAN_DIR = "./standardized_reports"
 DATABASE_FILE = "class_registry.csv"
+REGISTRY_FIELDS = ["Student_File", "Quality_Score", "Flags"]
 os.makedirs(SUBMISSION_DIR, exist_ok=True)
 os.makedirs(CLEAN_DIR, exist_ok=True)
 
@@ -21,13 +23,9 @@ class ProfessionalCV(BaseModel):
 
 
 # --- 2. THE ENGINE ---
-md = MarkItDown()
-
-
 def process_student_cv(filename):
     path = os.path.join(SUBMISSION_DIR, filename)
-    result = md.convert(path)
-    text = result.text_content
+    text = "".join(pdf_text.extract_pages(path, engine="markitdown"))
 
     # Check for quality issues (Inconsistencies)
     issues = []
@@ -45,27 +43,43 @@ def process_student_cv(filename):
     }
 
 
+def audit_file(file):
+    """Audits one submission, saves its standardized version and returns its registry row."""
+    report = process_student_cv(file)
+
+    # Save standardized version
+    with open(f"{CLEAN_DIR}/{file}.md", "w", encoding="utf-8") as f:
+        f.write(report["Clean_Text"])
+
+    return {
+        "Student_File": file,
+        "Quality_Score": report["Status"],
+        "Flags": report["Errors"]
+    }
+
+
 def main():
     data = []
-    for file in os.listdir(SUBMISSION_DIR):
-        if file.endswith((".pdf", ".docx")):
+    audited = 0
+    # Only new or changed submissions are audited; the rest keep their last row
+    manifest = file_manifest.Manifest("process_cvs.py")
+    files = sorted(f for f in os.listdir(SUBMISSION_DIR) if f.endswith((".pdf", ".docx")))
+    manifest.prune(os.path.join(SUBMISSION_DIR, f) for f in files)
+    for file in files:
+        path = os.path.join(SUBMISSION_DIR, file)
+        row = manifest.unchanged(path)
+        if row is None or not os.path.exists(f"{CLEAN_DIR}/{file}.md"):
             print(f"Auditing {file}...")
-            report = process_student_cv(file)
-
-            # Save standardized version
-            with open(f"{CLEAN_DIR}/{file}.md", "w", encoding="utf-8") as f:
-                f.write(report["Clean_Text"])
-
-            data.append({
-                "Student_File": file,
-                "Quality_Score": report["Status"],
-                "Flags": report["Errors"]
-            })
+            row = audit_file(file)
+            manifest.record(path, row)
+            audited += 1
+        data.append(row)
+    manifest.close()
 
     # 3. MAINTAIN ORGANIZED DATABASE
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(data, columns=REGISTRY_FIELDS)
     df.to_csv(DATABASE_FILE, index=False)
-    print("✓ Registry Updated.")
+    print(f"✓ Registry Updated ({audited} audited, {len(data) - audited} unchanged).")
 
 
 if __name__ == "__main__":
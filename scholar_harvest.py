@@ -0,0 +1,126 @@
+import json
+import time
+import random
+import sqlite3
+
+# --- RESUMABLE SEARCH HARVESTER ---
+# Every result is stored in SQLite under (query, rank) the moment it arrives,
+# so an interrupted harvest restarts at the first missing rank and repeated
+# topics are answered from disk. Failures (blocks, captchas, timeouts) are met
+# with exponential backoff and a fresh search started at the same rank; after
+# a clean stretch the pause shrinks again. A result that keeps failing (e.g. a
+# malformed entry) is skipped after RANK_RETRIES tries and remembered as such.
+CACHE_FILE = ".scholar_cache.db"
+PAGE_SIZE = 10         # results per search page; the polite pause is taken per page
+RANK_RETRIES = 3       # tries for one result before it is skipped
+
+
+class ResultCache:
+    def __init__(self, path=CACHE_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (query TEXT, rank INTEGER, row TEXT, fetched_at REAL,
+                                                PRIMARY KEY (query, rank));
+            CREATE TABLE IF NOT EXISTS exhausted (query TEXT PRIMARY KEY, total INTEGER);
+        """)
+
+    def rows(self, query, limit):
+        """Cached rows for ranks 0, 1, ... up to the first gap (at most limit); None for a skipped result."""
+        out = []
+        for rank, row in self.conn.execute("SELECT rank, row FROM results WHERE query = ? AND rank < ? ORDER BY rank",
+                                           (query, limit)):
+            if rank != len(out):
+                break
+            out.append(json.loads(row))
+        return out
+
+    def put(self, query, rank, row):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                              (query, rank, json.dumps(row, ensure_ascii=False), time.time()))
+
+    def total(self, query):
+        """Number of results the search has in all, once it has been seen to run out (else None)."""
+        row = self.conn.execute("SELECT total FROM exhausted WHERE query = ?", (query,)).fetchone()
+        return row[0] if row else None
+
+    def mark_exhausted(self, query, total):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO exhausted VALUES (?, ?)", (query, total))
+
+    def close(self):
+        self.conn.close()
+
+
+class Backoff:
+    """Pause between pages that doubles on every failure and decays while requests succeed."""
+
+    def __init__(self, base=1.0, max_delay=300.0):
+        self.base, self.max_delay = base, max_delay
+        self.delay = base
+
+    def success(self):
+        self.delay = max(self.base, self.delay * 0.7)
+
+    def failure(self):
+        self.delay = min(self.max_delay, self.delay * 2)
+        return self.delay
+
+    def pause(self, jitter=0.2):
+        # Jitter, so requests don't land on a fixed rhythm
+        time.sleep(self.delay * random.uniform(1 - jitter, 1 + jitter))
+
+
+def harvest(query, count, search, to_row, cache, max_failures=6, rank_retries=RANK_RETRIES, backoff=None,
+            log=print):
+    """
+    Yields (rank, row, cached) for ranks 0..count-1: stored rows first, then live
+    results from search(query, start_index). A rank that fails rank_retries times
+    is skipped. Stops early when the search runs out, or after max_failures
+    failures in a row (everything so far is kept).
+    """
+    backoff = backoff or Backoff()
+    rows = cache.rows(query, count)
+    for rank, row in enumerate(rows):
+        if row is not None:
+            yield rank, row, True
+
+    total = cache.total(query)
+    rank = len(rows)
+    if total is not None and rank >= total:
+        return
+    if rank < count:
+        log(f"↪️ Resuming '{query}' at result {rank + 1}" if rank else f"🔎 Searching for '{query}'...")
+
+    results, failures, rank_failures = None, 0, 0
+    while rank < count:
+        try:
+            if results is None:
+                results = search(query, rank)
+            if rank % PAGE_SIZE == 0:
+                backoff.pause()
+            row = to_row(next(results))
+        except StopIteration:
+            cache.mark_exhausted(query, rank)
+            return
+        except Exception as e:
+            failures += 1
+            rank_failures += 1
+            results = None  # a fresh search, started at this rank (or the next one)
+            if failures >= max_failures:
+                log(f"🛑 Giving up after {failures} failures in a row ({e}); re-run to resume at result {rank + 1}")
+                return
+            if rank_failures >= rank_retries:
+                log(f"⏭️ Skipping result {rank + 1} after {rank_failures} failures ({type(e).__name__}: {e})")
+                cache.put(query, rank, None)
+                rank, rank_failures = rank + 1, 0
+                continue
+            log(f"⚠️ {type(e).__name__} at result {rank + 1}; backing off {backoff.failure():.0f}s")
+            backoff.pause()
+            continue
+        failures = rank_failures = 0
+        backoff.success()
+        cache.put(query, rank, row)
+        yield rank, row, False
+        rank += 1
@@ -0,0 +1,45 @@
+import functools
+import streamlit as st
+
+# --- STREAMLIT CACHE WITH HIT-RATE TRACKING ---
+# A thin wrapper around st.cache_data that counts calls and real executions
+# per function, so the dashboards can show their hit rate.
+# Callers pass an explicit invalidation key (file stamp, fetch time...) as an
+# argument, so a cached value is reused only while its source is unchanged.
+stats = {}
+
+
+def _tracked(st_decorator, name, **kwargs):
+    def deco(fn):
+        counts = stats.setdefault(name, {"calls": 0, "misses": 0})
+
+        @functools.wraps(fn)
+        def compute(*args, **kw):
+            counts["misses"] += 1
+            return fn(*args, **kw)
+
+        cached = st_decorator(**kwargs)(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kw):
+            counts["calls"] += 1
+            return cached(*args, **kw)
+
+        call.clear = cached.clear
+        return call
+    return deco
+
+
+def cache_data(name, **kwargs):
+    """st.cache_data (values are copied per session) plus hit counting."""
+    return _tracked(st.cache_data, name, **kwargs)
+
+
+def hit_rates():
+    """Rows of name, calls, hits, hit rate % for display."""
+    rows = []
+    for name, c in stats.items():
+        hits = c["calls"] - c["misses"]
+        rows.append({"Cache": name, "Calls": c["calls"], "Hits": hits,
+                     "Hit Rate %": round(hits / c["calls"] * 100, 1) if c["calls"] else 0.0})
+    return rows
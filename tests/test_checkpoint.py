@@ -0,0 +1,29 @@
+import checkpoint
+
+
+def _append(path, title, ok=True):
+    with open(path, "a", encoding="utf-8") as fh:
+        checkpoint.append(fh, {"Title": title, "Link": f"https://example.org/{title}"}, ok)
+
+
+def test_append_after_a_torn_line_is_kept(tmp_path):
+    path = str(tmp_path / "progress.jsonl")
+    _append(path, "a")
+    _append(path, "b")
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"Title": "half of c", "Li')  # crash mid-write
+
+    assert set(checkpoint.load(path)) == {("a", "https://example.org/a"), ("b", "https://example.org/b")}
+    _append(path, "c")
+    _append(path, "d")
+
+    assert [key[0] for key in checkpoint.load(path)] == ["a", "b", "c", "d"]
+
+
+def test_failed_rows_are_retried(tmp_path):
+    path = str(tmp_path / "progress.jsonl")
+    _append(path, "a")
+    _append(path, "b", ok=False)
+    assert [key[0] for key in checkpoint.load(path)] == ["a"]
+    _append(path, "b")
+    assert [key[0] for key in checkpoint.load(path)] == ["a", "b"]
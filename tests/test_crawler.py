@@ -0,0 +1,141 @@
+import re
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler
+import pytest
+import crawler
+
+PAGES = 6
+
+
+def _page(n):
+    """quotes.toscrape.com-shaped markup: two quotes and a Next link, or nothing past the end."""
+    if n > PAGES:
+        return "<html><body><p>No quotes found!</p></body></html>"
+    quotes = "".join(f'<div class="quote"><span class="text">Quote {n}.{i}</span>'
+                     f'<small class="author">Author {n}</small></div>' for i in (1, 2))
+    nxt = f'<li class="next"><a href="/page/{n + 1}/">Next</a></li>' if n < PAGES else ""
+    return f"<html><body>{quotes}<ul>{nxt}</ul></body></html>"
+
+
+class QuotesHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    in_flight = max_in_flight = 0
+    statuses = []
+    generation = 1  # part of the ETag, as on a server whose ETags change on redeploy
+
+    def do_GET(self):
+        match = re.fullmatch(r"/page/(\d+)/", self.path)
+        if not match:
+            self.send_error(404)
+            return
+        cls = QuotesHandler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(0.05)  # long enough for fetches to overlap
+            body = _page(int(match.group(1))).encode("utf-8")
+            etag = f'"{cls.generation}-' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                status = 304
+            else:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                status = 200
+            with cls.lock:
+                cls.statuses.append(status)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_quotes(url, html):
+    """Top-level so the parse pool can pickle it; bot.parse_page (with BOT_PREFETCH=3) without bs4."""
+    rows = re.findall(r'<span class="text">(.*?)</span><small class="author">(.*?)</small>', html)
+    links = re.findall(r'<li class="next"><a href="(.*?)">', html)
+    if links:
+        n = int(re.search(r"/page/(\d+)/", links[0]).group(1))
+        links += [f"/page/{n + k}/" for k in (1, 2, 3)]
+    return [list(r) for r in rows], links
+
+
+@pytest.fixture
+def site(stub_server):
+    QuotesHandler.in_flight = QuotesHandler.max_in_flight = 0
+    QuotesHandler.statuses = []
+    QuotesHandler.generation = 1
+    return stub_server(QuotesHandler)
+
+
+def _crawl(base, cache=None):
+    found = {}
+    pages, unchanged = crawler.crawl([f"{base}/page/1/"], parse_quotes, lambda url, rows: found.update({url: rows}),
+                                     concurrency=4, rate=0, parse_workers=2, log=print, cache=cache)
+    return pages, unchanged, found
+
+
+def test_pages_are_fetched_in_parallel(site):
+    pages, unchanged, found = _crawl(site)
+
+    assert QuotesHandler.max_in_flight > 1
+    assert unchanged == 0
+    assert pages == len(found) == len(QuotesHandler.statuses)
+    quotes = [row for rows in found.values() for row in rows]
+    assert len(quotes) == 2 * PAGES
+    assert ["Quote 6.2", "Author 6"] in quotes
+
+
+def test_recrawl_with_cache_sends_conditional_requests(site, tmp_path):
+    cache = crawler.HttpCache(str(tmp_path / "http_cache.db"))
+    try:
+        first, _, _ = _crawl(site, cache)
+        QuotesHandler.statuses = []
+
+        pages, unchanged, found = _crawl(site, cache)
+    finally:
+        cache.close()
+
+    assert pages == 0 and found == {}
+    assert unchanged == first  # every page was followed through its stored links
+    assert QuotesHandler.statuses == [304] * first
+
+
+def test_new_validators_for_an_unchanged_body_are_stored(site, tmp_path):
+    cache = crawler.HttpCache(str(tmp_path / "http_cache.db"))
+    try:
+        first, _, _ = _crawl(site, cache)
+        QuotesHandler.generation = 2
+        QuotesHandler.statuses = []
+        pages, unchanged, _ = _crawl(site, cache)
+        assert (pages, unchanged) == (0, first)  # same bodies: nothing parsed
+        assert QuotesHandler.statuses == [200] * first
+
+        QuotesHandler.statuses = []
+        _crawl(site, cache)
+    finally:
+        cache.close()
+    assert QuotesHandler.statuses == [304] * first
+
+
+def test_bot_parse_page(monkeypatch):
+    pytest.importorskip("bs4")
+    import bot
+
+    rows, links = bot.parse_page("http://quotes.test/page/2/", _page(2))
+    assert rows == [["Quote 2.1", "Author 2"], ["Quote 2.2", "Author 2"]]
+    assert links == ["/page/3/"]  # only the link on the page
+    monkeypatch.setattr(bot, "PREFETCH", 3)
+    assert bot.parse_page("http://quotes.test/page/2/", _page(2))[1] == ["/page/3/", "/page/4/", "/page/5/", "/page/6/"]
+    assert bot.parse_page("http://quotes.test/page/9/", _page(9)) == ([], [])
@@ -0,0 +1,51 @@
+import re
+import random
+import timeit
+from cv_audit import DEFAULT_CRITERIA, DEFAULT_MATCHER, normalize_text
+
+CV = normalize_text("""
+    JANE DOE  |  P.O Box 1234, Dodoma  |  Mobile: +255712345678  |  jane.doe@example.com
+    Nationality: Tanzanian   Date of Birth: 1 May 2001   Marital Status: Single
+    PROFILE: A motivated graduate teacher with a passion for mathematics
+    EDUCATION: Bachelor of Education, University of Dodoma (2020-2024); KCSE, Mazengo Secondary School
+    EXPERIENCE: Teaching practice, Dodoma Secondary School - duties included lesson planning and assessment
+    LANGUAGES: English and Swahili (fluent)
+    COMPUTER SKILLS: Microsoft Office (Excel, Word, PowerPoint), internet research
+    CERTIFICATION: Registered teacher, Teachers' Service Commission
+    TRAINING: Workshop on inclusive education, 2023
+    REFEREES: Dr. A. Mushi, Department of Curriculum, University of Dodoma
+""" * 15)
+
+
+def baseline_audit(text):
+    """The loop the matcher replaced in app.py."""
+    t = " ".join(text.lower().split())
+    return {label: "✅ Found" if any(key in t for key in keywords) else "❌ Missing"
+            for label, keywords in DEFAULT_CRITERIA.items()}
+
+
+def test_same_result_as_the_old_loop():
+    rng = random.Random(7)
+    words = [w for ws in DEFAULT_CRITERIA.values() for w in ws] + ["lorem", "ipsum", "dolor", "Kiswahili"]
+    for _ in range(300):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 12)))
+        assert DEFAULT_MATCHER.audit(text)[0] == baseline_audit(text)
+    assert DEFAULT_MATCHER.audit(CV)[0] == baseline_audit(CV)
+
+
+def test_offsets_point_at_a_keyword():
+    _, offsets = DEFAULT_MATCHER.audit(CV)
+    for label, hit in offsets.items():
+        at, word = hit
+        assert CV[at:at + len(word)] == word and word in DEFAULT_CRITERIA[label]
+
+
+def test_faster_than_one_alternation_regex():
+    # The single-pass lookahead alternation is tried at every character
+    # position; the per-keyword scans with early exit are several times faster
+    keywords = sorted({w for ws in DEFAULT_CRITERIA.values() for w in ws}, key=len, reverse=True)
+    alternation = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+    scan = min(timeit.repeat(lambda: DEFAULT_MATCHER.find(CV), number=20, repeat=5))
+    regex = min(timeit.repeat(lambda: list(alternation.finditer(CV)), number=20, repeat=5))
+    print(f"\nkeyword scan {scan / 20 * 1000:.2f} ms, alternation regex {regex / 20 * 1000:.2f} ms per CV")
+    assert scan * 2 < regex
@@ -0,0 +1,62 @@
+import os
+import time
+import pytest
+import cv_jobs
+import cv_store
+
+
+def fake_audit(pdf_path, criteria=None):
+    """Stands in for the pdfplumber audit in the worker processes."""
+    return 70, f"audited {os.path.basename(pdf_path)}"
+
+
+def _wait_for(db_path, status, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cv_store.status_counts(db_path).get(status):
+            return
+        time.sleep(0.05)
+    pytest.fail(f"no submission reached {status!r}")
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv_jobs, "audit_file", fake_audit)
+    monkeypatch.setattr(cv_jobs, "MAX_WORKERS", 1)
+    monkeypatch.setattr(cv_jobs, "_pool", None)
+    yield str(tmp_path / "submissions.db")
+    if cv_jobs._pool is not None:
+        cv_jobs._pool.shutdown()
+
+
+def _pending(db_path, student_id):
+    return cv_store.append_submission(db_path, "Amina Juma", student_id, None, "⏳ Audit in progress",
+                                      "2026-01-01 10:00", status=cv_store.PENDING)
+
+
+def test_submit_after_a_worker_died(jobs):
+    # A worker that dies mid-job (a native crash on a bad PDF) breaks the pool
+    broken = cv_jobs._get_pool()
+    with pytest.raises(Exception):
+        broken.submit(os._exit, 1).result(timeout=10)
+
+    row_id = _pending(jobs, "2024001")
+    assert cv_jobs.submit(jobs, row_id, "student_uploads/2024001.pdf") is True
+    _wait_for(jobs, cv_store.DONE)
+    assert cv_jobs._pool is not broken
+    assert cv_store.find_latest(jobs, "2024001")["Audit_Details"] == "audited 2024001.pdf"
+
+
+def test_row_is_failed_when_no_pool_starts(jobs, monkeypatch):
+    broken = cv_jobs._get_pool()
+    with pytest.raises(Exception):
+        broken.submit(os._exit, 1).result(timeout=10)
+
+    def no_pool(max_workers):
+        raise OSError("cannot fork")
+    monkeypatch.setattr(cv_jobs, "ProcessPoolExecutor", no_pool)
+
+    row_id = _pending(jobs, "2024002")
+    assert cv_jobs.submit(jobs, row_id, "student_uploads/2024002.pdf") is False
+    row = cv_store.find_latest(jobs, "2024002")
+    assert row["Audit_Status"] == cv_store.FAILED and row["Audit_Details"].startswith("Audit Error")
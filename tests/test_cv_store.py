@@ -0,0 +1,43 @@
+import cv_store
+
+NAMES = ["Amina Juma", "amani Mushi", "Baraka Said", "100% Ali", "Al_Amin Kato", "Alpha Omari"]
+
+
+def _store(tmp_path):
+    path = str(tmp_path / "submissions.db")
+    for i, name in enumerate(NAMES):
+        cv_store.append_submission(path, name, f"2024{i:03d}", 50 + i, "", "2026-01-01 10:00")
+    return path
+
+
+def _names(path, search):
+    df, total = cv_store.query_submissions(path, search, sort="Name (A to Z)")
+    assert total == len(df)
+    return list(df["Name"])
+
+
+def test_name_search_is_a_case_insensitive_prefix(tmp_path):
+    path = _store(tmp_path)
+    assert _names(path, "am") == ["amani Mushi", "Amina Juma"]
+    assert _names(path, "AL") == ["Al_Amin Kato", "Alpha Omari"]
+    assert _names(path, "al_") == ["Al_Amin Kato"]  # no wildcards
+    assert _names(path, "100%") == ["100% Ali"]
+    assert _names(path, "mushi") == []
+
+
+def test_id_search_is_a_prefix(tmp_path):
+    path = _store(tmp_path)
+    assert _names(path, "2024003") == ["100% Ali"]
+    assert len(_names(path, "2024")) == len(NAMES)
+
+
+def test_searches_use_the_indexes(tmp_path):
+    conn = cv_store.connect(_store(tmp_path))
+    try:
+        for search, index in (("am", "idx_submissions_name_nocase"), ("2024", "idx_submissions_id")):
+            plan = " ".join(row[-1] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM submissions WHERE {cv_store._search_clause(search)}",
+                cv_store._prefix_range(search)))
+            assert index in plan and "SCAN submissions" not in plan
+    finally:
+        conn.close()
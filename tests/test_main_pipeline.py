@@ -0,0 +1,93 @@
+import io
+import os
+import json
+import asyncio
+import threading
+import pytest
+import ollama_stub
+
+pytest.importorskip("ollama")
+import main  # noqa: E402
+import llm_cache  # noqa: E402
+
+PAPERS = ["a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf"]
+
+
+class CountingHandler(ollama_stub.StubHandler):
+    lock = threading.Lock()
+    in_flight = max_in_flight = 0
+    prompts = []
+
+    def do_POST(self):
+        cls = CountingHandler
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.rfile = io.BytesIO(body)  # the stub reads it again
+        with cls.lock:
+            cls.prompts.append(json.loads(body)["messages"][-1]["content"])
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            super().do_POST()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+def fake_extract(pdf_path):
+    """Stands in for main.extract_text in the pool workers: two chunks naming the paper."""
+    name = os.path.basename(pdf_path)
+    return [("Introduction", f"intro of {name} " * 20), ("Conclusion", f"limits of {name} " * 20)]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch, stub_server):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ollama_stub, "DELAY", 0.05)
+    CountingHandler.in_flight = CountingHandler.max_in_flight = 0
+    CountingHandler.prompts = []
+    monkeypatch.setattr(main, "OLLAMA_HOST", stub_server(CountingHandler))
+    monkeypatch.setattr(main, "AI_CONCURRENCY", 2)
+    monkeypatch.setattr(main, "EXTRACT_WORKERS", 2)
+    monkeypatch.setattr(main, "extract_text", fake_extract)
+    monkeypatch.setattr(llm_cache, "CACHE_FILE", str(tmp_path / "llm_cache.db"))
+
+
+def test_inference_stays_within_ai_concurrency(pipeline):
+    results = {}
+    asyncio.run(main.run_pipeline(PAPERS, results))
+
+    assert set(results) == set(PAPERS)
+    assert all(a.startswith("Stub analysis") for a in results.values())
+    assert 1 < CountingHandler.max_in_flight <= main.AI_CONCURRENCY
+    with open(main.CHECKPOINT_FILE, encoding="utf-8") as f:
+        assert [json.loads(line)["File"] for line in f] == list(results)
+
+
+def test_resume_from_checkpoint(pipeline):
+    with open(main.CHECKPOINT_FILE, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"File": "a.pdf", "Analysis": "done before the crash"}) + "\n")
+        f.write(json.dumps({"File": "b.pdf", "Analysis": "Skip: Scanned image or unreadable formatting."}) + "\n")
+        f.write('{"File": "c.pdf", "Analy')  # cut off mid-write
+
+    results = main.load_results()
+    assert set(results) == {"a.pdf", "b.pdf"}
+    processed = {f for f, a in results.items() if "Skip" not in str(a)}
+    todo = [f for f in PAPERS if f not in processed]
+    assert todo == ["b.pdf", "c.pdf", "d.pdf", "e.pdf"]
+
+    asyncio.run(main.run_pipeline(todo, results))
+
+    # Crash again before the CSV is written: every record from this run survives
+    resumed = main.load_results()
+    assert set(resumed) == set(PAPERS)
+    assert all(resumed[f].startswith("Stub analysis") for f in todo)  # incl. the first one after the fragment
+
+    main.save_results(results)
+
+    asked = {name for name in PAPERS for prompt in CountingHandler.prompts if f"of {name}" in prompt}
+    assert asked == set(todo)  # a.pdf came from the checkpoint
+    assert not os.path.exists(main.CHECKPOINT_FILE)
+    saved = main.load_results()
+    assert set(saved) == set(PAPERS)
+    assert saved["a.pdf"] == "done before the crash"
+    assert all(saved[f].startswith("Stub analysis") for f in todo)
@@ -0,0 +1,91 @@
+import os
+import json
+import pytest
+import arxiv_stub
+import paper_fetch
+
+
+class CountingHandler(arxiv_stub.StubHandler):
+    requests = []
+
+    def do_GET(self):
+        CountingHandler.requests.append((self.path, self.headers.get("Range")))
+        super().do_GET()
+
+
+@pytest.fixture
+def arxiv(tmp_path, monkeypatch, stub_server):
+    monkeypatch.chdir(tmp_path)  # the shared file manifest lives in the working directory
+    monkeypatch.setattr(paper_fetch, "HOST_RATE", 1000.0)
+    monkeypatch.setattr(paper_fetch, "_limiters", {})
+    monkeypatch.setattr(paper_fetch.time, "sleep", lambda seconds: None)  # retry pauses
+    monkeypatch.setattr(arxiv_stub, "_cut", set())
+    CountingHandler.requests = []
+    base = stub_server(CountingHandler)
+
+    def papers(numbers):
+        return [{"arxiv_id": arxiv_stub._paper_id(n), "title": arxiv_stub._title(n),
+                 "pdf_url": f"{base}/pdf/{arxiv_stub._paper_id(n)}"} for n in numbers]
+    return papers
+
+
+def _quiet(message):
+    pass
+
+
+def test_interrupted_downloads_resume_with_range(arxiv, monkeypatch):
+    monkeypatch.setattr(arxiv_stub, "FLAKY", True)
+    monkeypatch.setattr(paper_fetch, "CHUNK", 16 * 1024)  # smaller than the half the stub sends
+    counts = paper_fetch.download_all(arxiv([5, 6, 7]), "papers", log=_quiet)
+
+    assert counts["downloaded"] == 3 and counts["failed"] == 0
+    resumed = [path for path, rng in CountingHandler.requests if rng and rng != "bytes=0-"]
+    assert len(resumed) == 3  # each cut-off transfer continued where it stopped
+    for n in (5, 6, 7):
+        name = paper_fetch.safe_filename(arxiv_stub._title(n), paper_fetch.base_id(arxiv_stub._paper_id(n)))
+        with open(os.path.join("papers", name), "rb") as f:
+            assert f.read() == arxiv_stub._pdf_bytes(arxiv_stub._paper_id(n))
+    assert not [f for f in os.listdir("papers") if f.endswith(".part")]
+
+
+def test_same_bytes_under_another_id_are_kept_once(arxiv):
+    counts = paper_fetch.download_all(arxiv([3, 4]), "papers", log=_quiet)
+
+    assert (counts["downloaded"], counts["duplicates"]) == (1, 1)
+    manifest = paper_fetch.load_manifest("papers")
+    assert manifest["2401.00003"]["file"] == manifest["2401.00004"]["file"]
+    assert len([f for f in os.listdir("papers") if f.endswith(".pdf")]) == 1
+
+
+def test_shared_title_prefix_gets_distinct_files(arxiv):
+    paper_fetch.download_all(arxiv([1, 2]), "papers", log=_quiet)
+    manifest = paper_fetch.load_manifest("papers")
+    assert manifest["2401.00001"]["file"] != manifest["2401.00002"]["file"]
+
+
+def test_rerun_skips_everything_in_the_manifest(arxiv):
+    paper_fetch.download_all(arxiv(range(3, 9)), "papers", log=_quiet)
+    CountingHandler.requests = []
+
+    counts = paper_fetch.download_all(arxiv(range(3, 9)), "papers", log=_quiet)
+    assert counts["skipped"] == 6 and counts["downloaded"] == 0
+    assert CountingHandler.requests == []
+
+
+def test_files_under_old_names_are_adopted(arxiv):
+    os.makedirs("papers")
+    legacy = paper_fetch.legacy_filename(arxiv_stub._title(5))
+    with open(os.path.join("papers", legacy), "wb") as f:
+        f.write(arxiv_stub._pdf_bytes(arxiv_stub._paper_id(5)))
+    with open(os.path.join("papers", "renamed by hand.pdf"), "wb") as f:
+        f.write(arxiv_stub._pdf_bytes(arxiv_stub._paper_id(6)))
+
+    counts = paper_fetch.download_all(arxiv([5, 6]), "papers", log=_quiet)
+
+    assert counts["downloaded"] == 0
+    with open(os.path.join("papers", paper_fetch.MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["2401.00005"]["file"] == legacy
+    assert manifest["2401.00006"]["file"] == "renamed by hand.pdf"
+    assert sorted(os.listdir("papers")) == sorted([legacy, "renamed by hand.pdf", paper_fetch.MANIFEST_NAME])
+    assert [path for path, _ in CountingHandler.requests] == ["/pdf/2401.00006v1"]  # fetched once to compare
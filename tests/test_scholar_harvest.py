@@ -0,0 +1,67 @@
+import pytest
+import scholar_harvest
+
+RESULTS = [{"bib": {"title": f"Paper {i}"}} for i in range(12)]
+RESULTS[4] = {"bib": None}  # a malformed entry: to_row fails on it every time
+
+
+class NoPause(scholar_harvest.Backoff):
+    def pause(self, jitter=0.2):
+        pass
+
+
+def to_row(paper):
+    return {"Title": paper["bib"]["title"]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = scholar_harvest.ResultCache(str(tmp_path / "scholar.db"))
+    yield cache
+    cache.close()
+
+
+def _harvest(cache, search, count=12, **kwargs):
+    return list(scholar_harvest.harvest("soil", count, search, to_row, cache, backoff=NoPause(),
+                                        log=lambda message: None, **kwargs))
+
+
+def test_a_result_that_always_fails_is_skipped(cache):
+    starts = []
+
+    def search(query, start):
+        starts.append(start)
+        return iter(RESULTS[start:])
+
+    got = _harvest(cache, search)
+    assert [rank for rank, _, _ in got] == [0, 1, 2, 3] + list(range(5, 12))
+    assert starts == [0, 4, 4, 5]  # tried RANK_RETRIES times, then searched from the next rank
+
+    starts.clear()
+    again = _harvest(cache, search)
+    assert [(rank, cached) for rank, _, cached in again] == [(rank, True) for rank, _, _ in got]
+    assert starts == []  # the skip is remembered
+
+
+def test_transient_failures_are_retried_at_the_same_rank(cache):
+    failures = {"left": 2}
+
+    def search(query, start):
+        def results():
+            for paper in RESULTS[start:]:
+                if start == 0 and paper is RESULTS[2] and failures["left"]:
+                    failures["left"] -= 1
+                    raise ConnectionError("blocked")
+                yield paper
+        return results()
+
+    got = _harvest(cache, search, count=4)
+    assert [row["Title"] for _, row, _ in got] == ["Paper 0", "Paper 1", "Paper 2", "Paper 3"]
+
+
+def test_gives_up_after_max_failures_in_a_row(cache):
+    def search(query, start):
+        raise ConnectionError("blocked")
+
+    assert _harvest(cache, search, max_failures=2) == []
+    assert cache.rows("soil", 12) == []
@@ -0,0 +1,52 @@
+import threading
+import numpy as np
+import pytest
+import vector_index
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(vector_index, "EMBEDDER", "hashing-512")
+
+
+def _doc(source, n):
+    return (source, f"doc {n}", f"Paper {n}", f"paper {n} studies topic{n} with method{n} in region{n}")
+
+
+def test_a_key_repeated_in_one_batch_keeps_its_last_text(index):
+    assert vector_index.add([("s", "k", "T", "first draft about soil"), ("s", "k", "T", "final text about water")]) == 1
+    hits = vector_index.search("water", k=5)
+    assert [h["text"] for h in hits] == ["final text about water"]
+
+
+def test_concurrent_writers_keep_vectors_and_rows_aligned(index):
+    vector_index.add([_doc("seed", 0)])  # creates the store before the writers race
+    writers = [threading.Thread(target=vector_index.add, args=([_doc(f"w{w}", w * 100 + i) for i in range(20)],))
+               for w in range(4)]
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+
+    conn = vector_index._connect()
+    try:
+        docs = conn.execute("SELECT row, text FROM docs ORDER BY row").fetchall()
+    finally:
+        conn.close()
+    mm = vector_index._vectors()
+    assert [row for row, _ in docs] == list(range(mm.shape[0])) == list(range(81))
+    for row, text in docs:
+        assert np.allclose(mm[row], vector_index.embed([text])[0])
+
+
+def test_search_skips_vectors_without_a_row(index):
+    vector_index.add([_doc("s", 1), _doc("s", 2)])
+    # As if a writer crashed after appending its vectors, before committing their rows
+    with open(vector_index._paths()[1], "ab") as f:
+        vector_index.embed(["paper 3 studies topic3 with method3 in region3"]).tofile(f)
+
+    hits = vector_index.search("topic3 method3 region3", k=3)
+    assert sorted(h["title"] for h in hits) == ["Paper 1", "Paper 2"]
+    vector_index.add([_doc("s", 4)])
+    assert vector_index.search("topic4 method4", k=1)[0]["title"] == "Paper 4"
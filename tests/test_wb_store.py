@@ -0,0 +1,71 @@
+import time
+import sqlite3
+import pytest
+import wb_store
+import worldbank_stub
+
+INDICATOR = "EG.ELC.RNEW.ZS"
+
+
+class CountingHandler(worldbank_stub.StubHandler):
+    paths = []
+
+    def do_GET(self):
+        CountingHandler.paths.append(self.path)
+        super().do_GET()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch, stub_server):
+    CountingHandler.paths = []
+    base = stub_server(CountingHandler)
+    monkeypatch.setattr(wb_store, "API_BASE", base + "/v2")
+    monkeypatch.setattr(wb_store, "DB_FILE", str(tmp_path / "wb.db"))
+    return CountingHandler.paths
+
+
+def test_bulk_fetch_then_served_from_disk(api):
+    df = wb_store.get_series(["US", "TZ"], INDICATOR)
+    assert sorted(df["iso2"].unique()) == ["TZ", "US"]
+    assert len(df) == 2 * len(worldbank_stub.YEARS)
+    assert len(api) == 1  # both countries in one request
+
+    row = df[(df["iso2"] == "TZ") & (df["year"] == 2020)].iloc[0]
+    assert row["value"] == pytest.approx(worldbank_stub._value("TZ", INDICATOR, 2020), nan_ok=True)
+
+    again = wb_store.get_series(["US", "TZ"], INDICATOR)
+    assert len(api) == 1  # nothing fetched: answered from the store
+    assert again.equals(df)
+
+
+def test_only_missing_countries_are_fetched(api):
+    wb_store.get_series(["US"], INDICATOR)
+    wb_store.get_series(["US", "KE"], INDICATOR)
+    assert len(api) == 2
+    assert "/country/KE/" in api[-1]
+
+
+def test_stale_series_served_then_refreshed_in_background(api):
+    wb_store.get_series(["US"], INDICATOR)
+    stale_at = time.time() - 2 * wb_store.TTL_SECONDS
+    with sqlite3.connect(wb_store.DB_FILE) as conn:
+        conn.execute("UPDATE fetched SET fetched_at = ?", (stale_at,))
+
+    df = wb_store.get_series(["US"], INDICATOR)
+    assert len(df) == len(worldbank_stub.YEARS)  # the stored copy, without waiting
+
+    deadline = time.time() + 5
+    while wb_store.last_fetched(INDICATOR) == stale_at and time.time() < deadline:
+        time.sleep(0.05)
+    assert wb_store.last_fetched(INDICATOR) > stale_at
+    assert len(api) == 2
+
+
+def test_unknown_code_does_not_reject_the_rest(api):
+    df = wb_store.get_series(["US", "XX"], INDICATOR)
+    assert set(df["iso2"]) == {"US"}
+
+
+def test_all_economies_leave_out_aggregates(api):
+    latest = wb_store.latest_values([wb_store.ALL], INDICATOR)
+    assert set(latest["iso2"]) == set(worldbank_stub.COUNTRIES)
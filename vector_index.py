@@ -0,0 +1,281 @@
+import os
+import re
+import zlib
+import sqlite3
+import hashlib
+import numpy as np
+import pandas as pd
+import context_pack
+
+# --- LOCAL SEMANTIC INDEX ---
+# Analyses (the *_analysis.csv files) and passages of the PDFs in papers/ are
+# embedded on the CPU and stored as rows of one float32 file that is searched
+# through a NumPy memmap: brute force (chunked dot products) for small corpora,
+# an inverted-file (IVF) index over k-means clusters once it grows large.
+# Metadata lives in SQLite next to it. Adding is incremental: a document is
+# embedded only when its content hash is new; an edited one replaces its row.
+# Embeddings are hashed word and bigram counts by default (no model needed);
+# set VECTOR_EMBEDDER to a sentence-transformers model name for dense ones.
+INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", ".vector_index")
+EMBEDDER = os.getenv("VECTOR_EMBEDDER", "hashing-512")
+HASH_DIM = 512
+SEARCH_CHUNK = 65536      # rows scored per step in a brute-force scan
+IVF_MIN_ROWS = 200000     # below this, exact brute force takes only tens of ms
+IVF_PROBES = 8            # clusters scanned per query, at least...
+IVF_PROBE_SHARE = 8       # ...or 1/8 of them
+
+# The analysis CSVs the pipelines write: path -> (title column, text column)
+SOURCES = {
+    "local_research_analysis.csv": ("File", "Analysis"),
+    "tanzania_knowledge_analysis.csv": ("Title", "AI_Analysis"),
+    "final_gap_analysis.csv": ("Title", "AI_Analysis"),
+}
+PAPERS_DIR = "papers"
+PASSAGE_WORDS = 200
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = set("""a an and are as at be been but by for from has have in is it its of on or that the their
+there these this to was were which with not no can will into than also such""".split())
+# Rows the pipelines write when a paper could not be analysed
+FAILED_RE = re.compile(r"^(AI Error|Skip:|Error)", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    row INTEGER PRIMARY KEY, source TEXT, doc_key TEXT, title TEXT, text TEXT,
+    sha256 TEXT, deleted INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_docs_key ON docs (source, doc_key);
+CREATE INDEX IF NOT EXISTS idx_docs_deleted ON docs (deleted);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+_st_model = None
+
+
+# --- EMBEDDINGS ---
+def _hash_embed(texts):
+    out = np.zeros((len(texts), HASH_DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        words = [w for w in TOKEN_RE.findall(text.lower()) if w not in STOPWORDS]
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(feature.encode("utf-8"))
+            # A second hash bit picks the sign, so collisions cancel out on average
+            out[i, h % HASH_DIM] += 1.0 if h & 0x80000000 else -1.0
+    return np.sign(out) * np.log1p(np.abs(out))
+
+
+def embed(texts):
+    """L2-normalised float32 embeddings, one row per text."""
+    global _st_model
+    if EMBEDDER.startswith("hashing"):
+        vectors = _hash_embed(texts)
+    else:
+        if _st_model is None:
+            from sentence_transformers import SentenceTransformer
+            _st_model = SentenceTransformer(EMBEDDER, device="cpu")
+        vectors = _st_model.encode(texts, batch_size=64, convert_to_numpy=True).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# --- STORAGE ---
+def _paths():
+    return (os.path.join(INDEX_DIR, "docs.db"), os.path.join(INDEX_DIR, "vectors.f32"),
+            os.path.join(INDEX_DIR, "ivf.npz"))
+
+
+def _connect():
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    db_path, vec_path, ivf_path = _paths()
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    stored = conn.execute("SELECT value FROM meta WHERE name = 'embedder'").fetchone()
+    if stored is None or stored[0] != EMBEDDER:
+        # Vectors from another embedder can't be compared with new ones: start over
+        with conn:
+            conn.execute("DELETE FROM docs")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('embedder', ?)", (EMBEDDER,))
+        for path in (vec_path, ivf_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return conn
+
+
+def _vectors():
+    """The stored vectors as a read-only memmap (None while the index is empty)."""
+    vec_path = _paths()[1]
+    if not os.path.exists(vec_path) or os.path.getsize(vec_path) == 0:
+        return None
+    dim = int(np.fromfile(vec_path, dtype=np.int32, count=1)[0])
+    rows = (os.path.getsize(vec_path) - 4) // (dim * 4)
+    return np.memmap(vec_path, dtype=np.float32, mode="r", offset=4, shape=(rows, dim))
+
+
+def add(docs, complete_sources=()):
+    """
+    docs: (source, doc_key, title, text) tuples. Embeds and appends the ones whose
+    text is new or changed; returns how many were added. For complete_sources,
+    docs holds everything that source has now, so its other entries are dropped.
+    """
+    conn = _connect()
+    try:
+        current = {(s, k): (row, sha) for row, s, k, sha in
+                   conn.execute("SELECT row, source, doc_key, sha256 FROM docs WHERE deleted = 0")}
+        # A key given twice in one batch (e.g. a repeated title) keeps its last text
+        docs = {(source, key): (source, key, title, text) for source, key, title, text in docs}.values()
+        new, replaced, seen = [], [], set()
+        for source, key, title, text in docs:
+            sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            old = current.get((source, key))
+            seen.add((source, key))
+            if old and old[1] == sha:
+                continue
+            if old and old[0] is not None:
+                replaced.append(old[0])
+            current[(source, key)] = (None, sha)
+            new.append((source, key, title, text, sha))
+        replaced += [row for (source, key), (row, _) in current.items()
+                     if source in complete_sources and (source, key) not in seen and row is not None]
+        if replaced:
+            with conn:
+                conn.executemany("UPDATE docs SET deleted = 1 WHERE row = ?", [(r,) for r in replaced])
+        if not new:
+            return 0
+
+        vectors = embed([text for _, _, _, text, _ in new])
+        vec_path = _paths()[1]
+        # The database write lock serialises writers: each appends its vectors
+        # and commits the rows naming them before the next one looks at the file
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            mm = _vectors()
+            start = 0 if mm is None else mm.shape[0]
+            with open(vec_path, "ab") as f:
+                if start == 0:
+                    f.truncate(0)
+                    np.array([vectors.shape[1]], dtype=np.int32).tofile(f)
+                vectors.tofile(f)
+            conn.executemany("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, 0)",
+                             [(start + i, *doc) for i, doc in enumerate(new)])
+        return len(new)
+    finally:
+        conn.close()
+
+
+# --- IVF ---
+def _kmeans(sample, k, iterations=10, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(k):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def _assign(mm, centroids, stop):
+    return np.concatenate([np.argmax(mm[i:i + SEARCH_CHUNK] @ centroids.T, axis=1)
+                           for i in range(0, stop, SEARCH_CHUNK)]).astype(np.int32)
+
+
+def _ivf(mm):
+    """(centroids, list assignment of the first `trained` rows, trained), rebuilt when the index doubles."""
+    ivf_path = _paths()[2]
+    if os.path.exists(ivf_path):
+        data = np.load(ivf_path)
+        if mm.shape[0] < 2 * int(data["trained"]):
+            return data["centroids"], data["assign"], int(data["trained"])
+    n = mm.shape[0]
+    sample = np.asarray(mm[np.random.default_rng(0).choice(n, min(n, 50000), replace=False)])
+    centroids = _kmeans(sample, int(np.sqrt(n)))
+    assign = _assign(mm, centroids, n)
+    np.savez(ivf_path, centroids=centroids, assign=assign, trained=n)
+    return centroids, assign, n
+
+
+# --- SEARCH ---
+def search(query, k=8, sources=None):
+    """Top-k documents for the query: list of dicts source, title, text, score."""
+    mm = _vectors()
+    if mm is None:
+        return []
+    q = embed([query])[0]
+    conn = _connect()
+    try:
+        if sources:
+            allowed = np.zeros(mm.shape[0], dtype=bool)
+            rows = conn.execute(f"SELECT row FROM docs WHERE deleted = 0 AND source IN ({','.join('?' * len(sources))})",
+                                list(sources))
+            allowed[np.fromiter((r for (r,) in rows), dtype=np.int64)] = True
+        else:
+            # Replaced / removed rows are the few to leave out
+            allowed = np.ones(mm.shape[0], dtype=bool)
+            allowed[np.fromiter((r for (r,) in conn.execute("SELECT row FROM docs WHERE deleted = 1")),
+                                dtype=np.int64)] = False
+
+        if mm.shape[0] < IVF_MIN_ROWS:
+            scores = np.concatenate([mm[i:i + SEARCH_CHUNK] @ q for i in range(0, mm.shape[0], SEARCH_CHUNK)])
+            scores[~allowed] = -np.inf
+        else:
+            # Score only the rows of the clusters nearest the query, plus rows added since training
+            centroids, assign, trained = _ivf(mm)
+            lists = np.argsort(centroids @ q)[-max(IVF_PROBES, len(centroids) // IVF_PROBE_SHARE):]
+            candidates = np.concatenate([np.flatnonzero(np.isin(assign, lists)), np.arange(trained, mm.shape[0])])
+            candidates = candidates[allowed[candidates]]
+            scores = np.full(mm.shape[0], -np.inf, dtype=np.float32)
+            scores[candidates] = mm[candidates] @ q
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = {r: (s, t, x) for r, s, t, x in conn.execute(
+            f"SELECT row, source, title, text FROM docs WHERE row IN ({','.join('?' * len(top))})",
+            [int(r) for r in top])}
+        # A crash between appending vectors and committing their rows leaves rows no doc names
+        return [{"source": rows[r][0], "title": rows[r][1], "text": rows[r][2], "score": float(scores[r])}
+                for r in top if r in rows]
+    finally:
+        conn.close()
+
+
+# --- SOURCES ---
+def sync_csv(path):
+    """Indexes the analyses in one of the SOURCES CSVs (failed rows are left out)."""
+    if not os.path.exists(path):
+        return 0
+    title_col, text_col = SOURCES[os.path.basename(path)]
+    df = pd.read_csv(path)
+    docs = []
+    for title, text in zip(df[title_col].astype(str), df[text_col]):
+        text = context_pack.clean(text) if isinstance(text, str) else ""
+        if text and not FAILED_RE.match(text):
+            docs.append((os.path.basename(path), title, title, text))
+    return add(docs, complete_sources=[os.path.basename(path)])
+
+
+def sync_papers(folder=PAPERS_DIR):
+    """
+    Indexes the PDFs in folder as ~PASSAGE_WORDS-word passages. Reads the same
+    pages main.py does (up to the references, from the shared cache), so no
+    page is parsed only for the index.
+    """
+    import paper_sections
+    if not os.path.isdir(folder):
+        return 0
+    docs = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".pdf"):
+            continue
+        try:
+            words = " ".join(text for _, text in paper_sections.read(os.path.join(folder, name))).split()
+        except Exception:
+            continue  # unreadable PDF; main.py reports those
+        for i in range(0, len(words), PASSAGE_WORDS):
+            docs.append(("papers", f"{name}#{i // PASSAGE_WORDS}", name, " ".join(words[i:i + PASSAGE_WORDS])))
+    return add(docs, complete_sources=["papers"])
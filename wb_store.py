@@ -0,0 +1,202 @@
+import os
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import pandas as pd
+
+# --- LOCAL WORLD BANK INDICATOR STORE ---
+# Full time series per (country, indicator) are kept in SQLite and served from
+# disk. A series missing from the store is fetched (in bulk, many countries per
+# request); one older than TTL_SECONDS is served as-is and refreshed in a
+# background thread. Large requests are split into country chunks and pages
+# that are fetched in parallel over one pooled, retrying session.
+# Set WORLD_BANK_API to a local stand-in
+# (see worldbank_stub.py) to run without the real API.
+API_BASE = os.getenv("WORLD_BANK_API", "https://api.worldbank.org/v2").rstrip("/")
+DB_FILE = os.getenv("WORLD_BANK_DB", ".worldbank.db")
+TTL_SECONDS = 24 * 3600
+PER_PAGE = 1000
+CHUNK_SIZE = 40      # country codes per request (keeps URLs short)
+FETCH_WORKERS = 8
+ALL = "ALL"          # every economy (aggregates such as 'World' are left out)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    iso2 TEXT, iso3 TEXT, name TEXT, indicator TEXT, year INTEGER, value REAL,
+    PRIMARY KEY (iso2, indicator, year)
+);
+CREATE INDEX IF NOT EXISTS idx_series_iso3 ON series (iso3, indicator);
+CREATE TABLE IF NOT EXISTS fetched (code TEXT, indicator TEXT, fetched_at REAL, PRIMARY KEY (code, indicator));
+CREATE TABLE IF NOT EXISTS countries (iso2 TEXT PRIMARY KEY, iso3 TEXT, name TEXT, region TEXT);
+"""
+
+
+def _make_session():
+    # Retries with exponential backoff on throttling and server errors
+    retry = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _make_session()
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def _connect():
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _get_page(url, page, timeout=15):
+    """(total pages, entries) of one API page; (0, None) when the API rejects the codes."""
+    response = _session.get(url, params={"format": "json", "per_page": PER_PAGE, "page": page}, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    # Unknown codes come back as [{"message": [...]}]
+    if isinstance(data[0], dict) and 'message' in data[0]:
+        return 0, None
+    entries = data[1] if len(data) > 1 and isinstance(data[1], list) else []
+    return int(data[0].get("pages", 1)), entries
+
+
+def _download(pool, path):
+    """Every page under path: page 1 first, then the rest (in parallel with a pool). None if rejected."""
+    url = f"{API_BASE}/{path}"
+    pages, entries = _get_page(url, 1)
+    if entries is None:
+        return None
+    rest = range(2, pages + 1)
+    for _, more in (pool.map(lambda p: _get_page(url, p), rest) if pool else map(lambda p: _get_page(url, p), rest)):
+        entries.extend(more or [])
+    return entries
+
+
+def _download_codes(pool, codes, indicator):
+    entries = _download(pool, f"country/{';'.join(codes)}/indicator/{indicator}")
+    if entries is None and len(codes) > 1:
+        # One bad code rejects the whole request, so retry the chunk code by code
+        entries = []
+        for part in pool.map(lambda c: _download(None, f"country/{c}/indicator/{indicator}"), codes):
+            entries.extend(part or [])
+    return entries or []
+
+
+def fetch_series(codes, indicator):
+    """Downloads the full series for the given countries and stores it. Returns rows stored."""
+    codes = [c.upper() for c in codes]
+    chunks = [codes[i:i + CHUNK_SIZE] for i in range(0, len(codes), CHUNK_SIZE)]
+    # Chunks and pages share one pool; the outer level uses its own threads
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool, \
+            ThreadPoolExecutor(max_workers=min(len(chunks), FETCH_WORKERS)) as outer:
+        entries = [e for part in outer.map(lambda ch: _download_codes(pool, ch, indicator), chunks) for e in part]
+    rows = [(e["country"]["id"], e.get("countryiso3code"), e["country"]["value"], indicator,
+             int(e["date"]), e["value"])
+            for e in entries if str(e.get("date", "")).isdigit()]
+    now = time.time()
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT OR REPLACE INTO fetched VALUES (?, ?, ?)",
+                             [(c, indicator, now) for c in codes])
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def _refresh_in_background(codes, indicator):
+    key = (tuple(codes), indicator)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            fetch_series(codes, indicator)
+        except Exception:
+            pass  # keep serving the stored copy; retried on a later call
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def economies():
+    """Every country (no aggregates) as a DataFrame iso2, iso3, name; fetched once."""
+    conn = _connect()
+    try:
+        df = pd.read_sql_query("SELECT iso2, iso3, name FROM countries WHERE region != 'Aggregates'", conn)
+        if df.empty:
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+                entries = _download(pool, "country") or []
+            rows = [(e["iso2Code"], e["id"], e["name"], e["region"]["value"].strip()) for e in entries]
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO countries VALUES (?, ?, ?, ?)", rows)
+            df = pd.read_sql_query("SELECT iso2, iso3, name FROM countries WHERE region != 'Aggregates'", conn)
+        return df
+    finally:
+        conn.close()
+
+
+def get_series(codes, indicator, ttl=TTL_SECONDS):
+    """
+    Stored series for the countries (2- or 3-letter codes, or [ALL]) as a
+    DataFrame with columns iso2, iso3, name, year, value. Fetches what is missing first.
+    """
+    if ALL in [c.upper() for c in codes if c]:
+        codes = economies()["iso2"].tolist()
+    codes = [c.upper() for c in codes if c]
+    if not codes:
+        return pd.DataFrame(columns=["iso2", "iso3", "name", "year", "value"])
+    conn = _connect()
+    try:
+        marks = ",".join("?" * len(codes))
+        fetched = dict(conn.execute(
+            f"SELECT code, fetched_at FROM fetched WHERE indicator = ? AND code IN ({marks})",
+            [indicator, *codes]).fetchall())
+    finally:
+        conn.close()
+
+    missing = [c for c in codes if c not in fetched]
+    stale = [c for c in codes if c in fetched and time.time() - fetched[c] > ttl]
+    if missing:
+        fetch_series(missing, indicator)
+    if stale:
+        _refresh_in_background(stale, indicator)
+
+    conn = _connect()
+    try:
+        return pd.read_sql_query(
+            f"SELECT iso2, iso3, name, year, value FROM series WHERE indicator = ? "
+            f"AND (iso2 IN ({marks}) OR iso3 IN ({marks})) ORDER BY iso2, year",
+            conn, params=[indicator, *codes, *codes])
+    finally:
+        conn.close()
+
+
+def latest_values(codes, indicator):
+    """Most recent non-null value per country: DataFrame iso2, iso3, name, year, value."""
+    df = get_series(codes, indicator).dropna(subset=["value"])
+    return df.sort_values("year").groupby("iso2", as_index=False).last()
+
+
+def last_fetched(indicator):
+    """When any series of this indicator last changed in the store (for cache keys)."""
+    conn = _connect()
+    try:
+        return conn.execute("SELECT MAX(fetched_at) FROM fetched WHERE indicator = ?", (indicator,)).fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,100 @@
+import os
+import json
+import math
+import zlib
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# --- LOCAL WORLD BANK API STAND-IN ---
+# Serves /v2/country and /v2/country/<codes>/indicator/<indicator> in the World Bank JSON shape
+# with deterministic synthetic series, so esg.py / wb_store.py run offline:
+#   python worldbank_stub.py
+#   WORLD_BANK_API=http://127.0.0.1:8765/v2 streamlit run esg.py
+PORT = int(os.getenv("STUB_PORT", "8765"))
+YEARS = range(1990, 2023)
+
+COUNTRIES = {
+    "US": ("USA", "United States"), "TZ": ("TZA", "Tanzania"), "IN": ("IND", "India"),
+    "CN": ("CHN", "China"), "DE": ("DEU", "Germany"), "BR": ("BRA", "Brazil"),
+    "KE": ("KEN", "Kenya"), "ZA": ("ZAF", "South Africa"), "GB": ("GBR", "United Kingdom"),
+    "FR": ("FRA", "France"), "JP": ("JPN", "Japan"), "NG": ("NGA", "Nigeria"),
+}
+ISO3 = {iso3: iso2 for iso2, (iso3, _) in COUNTRIES.items()}
+AGGREGATES = {"1W": ("WLD", "World")}
+
+
+def _value(iso2, indicator, year):
+    seed = zlib.crc32(f"{iso2}{indicator}".encode())
+    base = 5 + seed % 60
+    slope = ((seed >> 8) % 21 - 10) / 20
+    if (seed + year) % 11 == 0:
+        return None  # gaps, like the real data
+    return round(base + slope * (year - 1990) + math.sin(year + seed) * 0.5, 3)
+
+
+def _country_list():
+    rows = [{"id": iso3, "iso2Code": iso2, "name": name, "region": {"id": "SSF", "value": "Somewhere"}}
+            for iso2, (iso3, name) in COUNTRIES.items()]
+    rows += [{"id": iso3, "iso2Code": iso2, "name": name, "region": {"id": "NA", "value": "Aggregates"}}
+             for iso2, (iso3, name) in AGGREGATES.items()]
+    return rows
+
+
+def _entries(codes, indicator):
+    if "ALL" in codes:
+        codes = list(COUNTRIES)
+    entries = []
+    for code in codes:
+        iso2 = code if code in COUNTRIES else ISO3.get(code)
+        if iso2 is None:
+            return []  # like the real API, one bad code rejects the whole request
+        iso3, name = COUNTRIES[iso2]
+        for year in reversed(YEARS):
+            entries.append({
+                "indicator": {"id": indicator, "value": indicator},
+                "country": {"id": iso2, "value": name},
+                "countryiso3code": iso3,
+                "date": str(year),
+                "value": _value(iso2, indicator, year),
+            })
+    return entries
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = parse_qs(url.query)
+        per_page = int(query.get("per_page", ["50"])[0])
+        page = int(query.get("page", ["1"])[0])
+
+        # v2 / country   or   v2 / country / <codes> / indicator / <indicator>
+        if parts == ["v2", "country"]:
+            entries = _country_list()
+        elif len(parts) == 5 and parts[1] == "country" and parts[3] == "indicator":
+            entries = _entries([c.upper() for c in parts[2].split(";")], parts[4])
+        else:
+            self.send_error(404)
+            return
+
+        if not entries:
+            body = [{"message": [{"id": "120", "key": "Invalid value", "value": "The provided parameter value is not valid"}]}]
+        else:
+            pages = max(1, math.ceil(len(entries) / per_page))
+            chunk = entries[(page - 1) * per_page: page * per_page]
+            body = [{"page": page, "pages": pages, "per_page": per_page, "total": len(entries)}, chunk]
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    print(f"🌍 World Bank stub listening on http://127.0.0.1:{PORT}/v2")
+    ThreadingHTTPServer(("127.0.0.1", PORT), StubHandler).serve_forever()
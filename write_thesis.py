@@ -1,26 +1,45 @@
-import pandas as pd
-import ollama
+import llm_cache
+import context_pack
+import vector_index
 
-# 1. Load your analyzed data
+PROMPT_VERSION = "thesis-v1"
+MODEL_NAME = 'deepseek-r1:1.5b'
+TOPIC = "Internal Communication between South Africa and India"
+# Token budget for the gaps section of the prompt
+CONTEXT_BUDGET = 2500
+# Gaps retrieved from the local index (most relevant to TOPIC first)
+TOP_K = 15
+
+
+def summarize(text):
+    """Condenses a batch of gaps when they do not all fit in CONTEXT_BUDGET."""
+    response = llm_cache.chat(model=MODEL_NAME, messages=[{'role': 'user', 'content': (
+        "List the distinct research gaps in these paper analyses as short bullet points:\n" + text)}],
+        template="thesis-summary-v1")
+    return response['message']['content']
+
+
+# 1. Load your analyzed data (skipped / failed papers are never indexed)
 try:
-    df = pd.read_csv("local_research_analysis.csv")
-    # Remove any rows where the AI skipped the paper
-    df = df[~df['Analysis'].str.contains("Skip:", na=False)]
+    vector_index.sync_csv("local_research_analysis.csv")
+    hits = vector_index.search(TOPIC, k=TOP_K, sources=["local_research_analysis.csv"])
+    if not hits:
+        raise FileNotFoundError("no analysed papers indexed yet")
 except Exception as e:
     print(f"❌ Could not find or read the CSV: {e}")
     exit()
 
-print(f"📄 Synthesizing {len(df)} analyzed papers into a proposal...")
+print(f"📄 Synthesizing the {len(hits)} most relevant analyzed papers into a proposal...")
 
 # 2. Prepare the prompt for the "Master Synthesis"
-# We give the AI the top 10 most relevant gaps found in your CSV
-gaps_summary = "\n".join(df['Analysis'].head(10).tolist())
+# We give the AI the most relevant (deduplicated) gaps that fit the token budget
+gaps_summary = context_pack.build_context([h['text'] for h in hits], TOPIC, CONTEXT_BUDGET, summarize=summarize)
 
 master_prompt = f"""
 You are a senior PhD supervisor. Based on the following research gaps found in recent literature, 
 write a structured Thesis Proposal Draft.
 
-TOP TOPIC: Internal Communication between South Africa and India
+TOP TOPIC: {TOPIC}
 GAPS FOUND IN LITERATURE:
 {gaps_summary}
 
@@ -33,12 +52,13 @@ PROPOSAL STRUCTURE:
 
 # 3. Generate the Thesis
 print("🧠 DeepSeek is drafting your proposal (this takes 2-3 minutes)...")
-response = ollama.chat(model='deepseek-r1:1.5b', messages=[
+response = llm_cache.chat(model=MODEL_NAME, messages=[
     {'role': 'user', 'content': master_prompt}
-])
+], template=PROMPT_VERSION)
 
 # 4. Save to a Text File
 with open("FINAL_THESIS_PROPOSAL.txt", "w", encoding="utf-8") as f:
     f.write(response['message']['content'])
 
-print("\n✨ SUCCESS! Your draft is ready: 'FINAL_THESIS_PROPOSAL.txt'")
\ No newline at end of file
+print("\n✨ SUCCESS! Your draft is ready: 'FINAL_THESIS_PROPOSAL.txt'")
+print(llm_cache.summary())
\ No newline at end of file